@@ -1,9 +1,13 @@
 """Main UBL exporter module."""
 
 import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Tuple, Union
 from datetime import datetime
+from functools import lru_cache
 from decimal import Decimal
 
 from ..extractors.pdf_extractor import ExtractedInvoiceData
@@ -13,6 +17,131 @@ from .xml_generator import XMLGenerator
 logger = logging.getLogger(__name__)
 
 
+def _parse_numeric_date(value: str, separator: str, year_first: bool) -> Optional[datetime]:
+    """Parse a zero-padded numeric date using slicing instead of strptime."""
+    if year_first:
+        if value[4] != separator or value[7] != separator:
+            return None
+        year, month, day = value[0:4], value[5:7], value[8:10]
+    else:
+        if value[2] != separator or value[5] != separator:
+            return None
+        day, month, year = value[0:2], value[3:5], value[6:10]
+    
+    if not (year.isdecimal() and month.isdecimal() and day.isdecimal()):
+        return None
+    
+    try:
+        return datetime(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def _parse_ymd(value: str) -> Optional[datetime]:
+    """Parse ``YYYY-MM-DD``."""
+    return _parse_numeric_date(value, '-', year_first=True)
+
+
+def _parse_dmy_dash(value: str) -> Optional[datetime]:
+    """Parse ``DD-MM-YYYY``."""
+    return _parse_numeric_date(value, '-', year_first=False)
+
+
+def _parse_dmy_dot(value: str) -> Optional[datetime]:
+    """Parse ``DD.MM.YYYY``."""
+    return _parse_numeric_date(value, '.', year_first=False)
+
+
+def _parse_dmy_slash(value: str) -> Optional[datetime]:
+    """Parse ``DD/MM/YYYY``."""
+    return _parse_numeric_date(value, '/', year_first=False)
+
+
+# Day-first parsers keyed by the separator found at index 2
+_DMY_PARSERS = {
+    '-': _parse_dmy_dash,
+    '.': _parse_dmy_dot,
+    '/': _parse_dmy_slash,
+}
+
+
+def _fast_parse_date(value: str) -> Optional[datetime]:
+    """Parse the common fixed-width numeric date formats without strptime.
+    
+    Returns None when the string is not one of the handled shapes so the
+    caller can fall back to the generic strptime loop.
+    """
+    if len(value) != 10:
+        return None
+    
+    if value[4] == '-':
+        return _parse_ymd(value)
+    
+    parser = _DMY_PARSERS.get(value[2])
+    return parser(value) if parser else None
+
+
+# Dutch month names mapped to English for strptime's %B directive
+_DUTCH_MONTHS = {
+    'januari': 'January', 'februari': 'February', 'maart': 'March',
+    'april': 'April', 'mei': 'May', 'juni': 'June',
+    'juli': 'July', 'augustus': 'August', 'september': 'September',
+    'oktober': 'October', 'november': 'November', 'december': 'December'
+}
+
+_DATE_FORMATS = ['%d %B %Y', '%d.%m.%Y', '%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d']
+
+
+@lru_cache(maxsize=256)
+def _parse_date(value: str) -> Optional[datetime]:
+    """Parse a date string as found on invoices, returning None on failure.
+    
+    Only called with strings (see _coerce_date), so the only expected
+    error is the ValueError strptime raises for a non-matching format.
+    """
+    parsed = _fast_parse_date(value)
+    if parsed:
+        return parsed
+    
+    # Replace Dutch month names with English for parsing
+    date_str_en = value
+    for dutch, english in _DUTCH_MONTHS.items():
+        date_str_en = date_str_en.replace(dutch, english)
+    
+    # Try common date formats including Dutch format
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str_en, fmt)
+        except ValueError:
+            continue
+    
+    return None
+
+
+def _coerce_date(value: Any) -> Optional[datetime]:
+    """Return value as a datetime, parsing it first when it is a string."""
+    if isinstance(value, str):
+        return _parse_date(value)
+    return value
+
+
+# Exporter owned by a worker process of UBLExporter.export_many
+_worker_exporter: Optional['UBLExporter'] = None
+
+
+def _init_export_worker(exporter_settings: Dict[str, Any]):
+    """Create one exporter (and XMLGenerator) per worker process."""
+    global _worker_exporter
+    _worker_exporter = UBLExporter(**exporter_settings)
+
+
+def _export_one(args: Tuple[ExtractedInvoiceData, Path, Optional[Dict[str, Any]]]) -> Path:
+    """Export a single invoice inside a worker process."""
+    extracted_data, output_path, template_config = args
+    _worker_exporter.export_to_ubl(extracted_data, output_path, template_config)
+    return output_path
+
+
 class UBLExporter:
     """Main UBL exporter class that converts extracted invoice data to UBL XML."""
     
@@ -67,69 +196,57 @@ class UBLExporter:
         
         return xml_content
     
+    def export_many(self,
+                    data_items: Iterable[ExtractedInvoiceData],
+                    output_dir: Path,
+                    template_config: Optional[Dict[str, Any]] = None,
+                    max_workers: Optional[int] = None) -> List[Path]:
+        """Export many invoices to UBL XML files using a process pool.
+        
+        Files are named ``<index>_<invoice number>.xml`` so invoices that share
+        a number do not overwrite each other.
+        
+        Args:
+            data_items: Extracted invoice data, one item per invoice
+            output_dir: Directory to write the XML files to
+            template_config: Optional template configuration for field mapping
+            max_workers: Number of worker processes (default: CPU count)
+            
+        Returns:
+            Paths of the written XML files, in input order
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        jobs = []
+        for index, extracted_data in enumerate(data_items, start=1):
+            stem = re.sub(r'[^\w\-]', '_', extracted_data.invoice_number or 'invoice')
+            jobs.append((extracted_data, output_dir / f"{index:04d}_{stem}.xml", template_config))
+        
+        if not jobs:
+            return []
+        
+        exporter_settings = {
+            'default_currency': self.default_currency,
+            'default_country': self.default_country,
+            'default_vat_rate': self.default_vat_rate,
+        }
+        
+        self.logger.info(f"Exporting {len(jobs)} invoices to {output_dir}")
+        
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                 initializer=_init_export_worker,
+                                 initargs=(exporter_settings,)) as executor:
+            return list(executor.map(_export_one, jobs))
+    
     def _create_ubl_invoice(self, 
                            data: ExtractedInvoiceData,
                            template_config: Optional[Dict[str, Any]] = None) -> UBLInvoice:
         """Create UBL invoice from extracted data."""
         
         # Create base invoice
-        issue_date = data.invoice_date or datetime.now()
-        
-        # Convert string date to datetime if needed
-        if isinstance(issue_date, str):
-            try:
-                # Handle Dutch month names first
-                dutch_months = {
-                    'januari': 'January', 'februari': 'February', 'maart': 'March',
-                    'april': 'April', 'mei': 'May', 'juni': 'June',
-                    'juli': 'July', 'augustus': 'August', 'september': 'September',
-                    'oktober': 'October', 'november': 'November', 'december': 'December'
-                }
-                
-                # Replace Dutch month names with English for parsing
-                date_str_en = issue_date
-                for dutch, english in dutch_months.items():
-                    date_str_en = date_str_en.replace(dutch, english)
-                
-                # Try common date formats including Dutch format
-                for fmt in ['%d %B %Y', '%d.%m.%Y', '%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d']:
-                    try:
-                        issue_date = datetime.strptime(date_str_en, fmt)
-                        break
-                    except ValueError:
-                        continue
-                else:
-                    # If no format works, use current date
-                    issue_date = datetime.now()
-            except:
-                issue_date = datetime.now()
-        
-        due_date = data.due_date
-        if due_date and isinstance(due_date, str):
-            try:
-                # Handle Dutch month names
-                dutch_months = {
-                    'januari': 'January', 'februari': 'February', 'maart': 'March',
-                    'april': 'April', 'mei': 'May', 'juni': 'June',
-                    'juli': 'July', 'augustus': 'August', 'september': 'September',
-                    'oktober': 'October', 'november': 'November', 'december': 'December'
-                }
-                
-                # Replace Dutch month names with English for parsing
-                date_str_en = due_date
-                for dutch, english in dutch_months.items():
-                    date_str_en = date_str_en.replace(dutch, english)
-                
-                for fmt in ['%d %B %Y', '%d.%m.%Y', '%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d']:
-                    try:
-                        due_date = datetime.strptime(date_str_en, fmt)
-                        break
-                    except ValueError:
-                        continue
-                else:
-                    due_date = None
-            except:
-                due_date = None
+        issue_date = _coerce_date(data.invoice_date) or datetime.now()
+        due_date = _coerce_date(data.due_date)
         
         if not due_date:
             due_date = issue_date.replace(day=28) if issue_date.day < 28 else issue_date
@@ -336,7 +453,7 @@ class UBLExporter:
         
         return invoice
     
-    def validate_ubl_xml(self, xml_content: str) -> bool:
+    def validate_ubl_xml(self, xml_content: Union[str, bytes]) -> bool:
         """Validate UBL XML content."""
         return self.xml_generator.validate_xml(xml_content)
     
@@ -175,9 +175,17 @@ class UBLInvoice:
     customization_id: str = "urn:cen.eu:en16931:2017#compliant#urn:fdc:peppol.eu:2017:poacc:billing:international:aunz:3.0"
     profile_id: str = "urn:fdc:peppol.eu:2017:poacc:billing:international:aunz:3.0"
     
+    # Set by the add_* helpers; totals are only recomputed when True
+    _dirty: bool = field(default=True, init=False, repr=False, compare=False)
+    
     def calculate_totals(self):
-        """Calculate all totals based on line items."""
-        if not self.invoice_lines:
+        """Calculate all totals based on line items.
+        
+        Does nothing when no line item or payment means was added since the
+        previous call. Code that edits ``invoice_lines`` directly must set
+        ``_dirty`` itself.
+        """
+        if not self.invoice_lines or not self._dirty:
             return
         
         # Calculate line extension amount
@@ -232,6 +240,8 @@ class UBLInvoice:
             payable_amount=line_extension_amount + total_tax_amount,
             currency_code=self.document_currency_code
         )
+        
+        self._dirty = False
     
     def add_line_item(self, 
                      description: str,
@@ -276,6 +286,7 @@ class UBLInvoice:
         )
         
         self.invoice_lines.append(line_item)
+        self._dirty = True
         return line_item
     
     def set_supplier(self, name: str, address: str = None, vat_number: str = None, 
@@ -285,7 +296,7 @@ class UBLInvoice:
         supplier_address = None
         if address:
             # Parse address (basic implementation)
-            address_lines = address.split('\n')
+            address_lines = address.splitlines()
             supplier_address = UBLAddress(
                 address_lines=address_lines,
                 country_code="NL"
@@ -307,7 +318,7 @@ class UBLInvoice:
         customer_address = None
         if address:
             # Parse address (basic implementation)
-            address_lines = address.split('\n')
+            address_lines = address.splitlines()
             customer_address = UBLAddress(
                 address_lines=address_lines,
                 country_code="NL"
@@ -335,4 +346,5 @@ class UBLInvoice:
         )
         
         self.payment_means.append(payment_means)
+        self._dirty = True
         return payment_means
\ No newline at end of file
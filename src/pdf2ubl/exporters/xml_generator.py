@@ -1,38 +1,153 @@
 """XML generation utilities for UBL documents."""
 
-from typing import Optional, Dict, Any
-from datetime import datetime
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, Union
+from datetime import date, datetime
+from functools import lru_cache, partial
 from decimal import Decimal
+from xml.sax.saxutils import escape, quoteattr
 from lxml import etree
-from .ubl_models import UBLInvoice, UBLAddress, UBLParty, UBLLineItem, UBLTaxTotal, UBLTaxSubtotal
+from .ubl_models import (UBLInvoice, UBLAddress, UBLParty, UBLLineItem, UBLPaymentMeans, UBLTaxTotal,
+                         UBLTaxSubtotal)
 from ..utils.amount_formatter import format_amount_for_xml, format_percentage_for_xml, format_quantity_for_xml
 
 
+# UBL 2.1 invoice namespace map, shared by all generators
+NAMESPACES = {
+    None: "urn:oasis:names:specification:ubl:schema:xsd:Invoice-2",
+    "cac": "urn:oasis:names:specification:ubl:schema:xsd:CommonAggregateComponents-2",
+    "cbc": "urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2",
+    "xsi": "http://www.w3.org/2001/XMLSchema-instance"
+}
+
+SCHEMA_LOCATION = (
+    "urn:oasis:names:specification:ubl:schema:xsd:Invoice-2 "
+    "http://docs.oasis-open.org/ubl/os-UBL-2.1/xsd/maindoc/UBL-Invoice-2.1.xsd"
+)
+
+# Top-level elements validate_xml requires in every invoice
+_REQUIRED_ELEMENTS = frozenset({
+    "{urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2}ID",
+    "{urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2}IssueDate",
+    "{urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2}DocumentCurrencyCode",
+})
+
+# Invoice line templates; rendered in bulk by XMLGenerator._render_invoice_lines
+_LINES_OPEN = '<cac:InvoiceLines xmlns="%s" xmlns:cac="%s" xmlns:cbc="%s">'
+_LINES_CLOSE = '</cac:InvoiceLines>'
+_LINE_HEAD = (
+    '<cac:InvoiceLine><cbc:ID>%s</cbc:ID>'
+    '<cbc:InvoicedQuantity unitCode=%s>%s</cbc:InvoicedQuantity>'
+    '<cbc:LineExtensionAmount currencyID=%s>%s</cbc:LineExtensionAmount>'
+    '<cac:Item>'
+)
+_LINE_DESCRIPTION = '<cbc:Description>%s</cbc:Description>'
+_LINE_NAME = '<cbc:Name>%s</cbc:Name>'
+_LINE_TAX_CATEGORY_HEAD = '<cac:ClassifiedTaxCategory><cbc:ID>%s</cbc:ID>'
+_LINE_PERCENT = '<cbc:Percent>%s</cbc:Percent>'
+_LINE_TAX_CATEGORY_TAIL = (
+    '<cac:TaxScheme><cbc:ID>%s</cbc:ID></cac:TaxScheme></cac:ClassifiedTaxCategory>'
+)
+_LINE_ITEM_TAIL = '</cac:Item>'
+_LINE_PRICE = (
+    '<cac:Price>'
+    '<cbc:PriceAmount currencyID=%s>%s</cbc:PriceAmount>'
+    '<cbc:BaseQuantity unitCode=%s>%s</cbc:BaseQuantity>'
+    '</cac:Price>'
+)
+_LINE_TAIL = '</cac:InvoiceLine>'
+
+
+# Carriage returns are written as character references, as lxml does for
+# element text; a literal CR would be turned into LF when the template is
+# parsed (XML line-end normalisation)
+_TEXT_ENTITIES = {'\r': '&#13;'}
+
+
+def _xml_text(value: str) -> str:
+    """Escape text for an XML template, skipping the common clean case."""
+    if '&' in value or '<' in value or '>' in value or '\r' in value:
+        return escape(value, _TEXT_ENTITIES)
+    return value
+
+
+@lru_cache(maxsize=256)
+def _xml_attr(value: str) -> str:
+    """Quote an attribute value for an XML template.
+    
+    Cached because attribute values are a handful of unit and currency
+    codes repeated on every invoice line.
+    """
+    return quoteattr(value)
+
+
+def _iso_date(value: Union[datetime, date]) -> str:
+    """Format a date or datetime as YYYY-MM-DD.
+    
+    Not cached: aware datetimes for the same instant compare equal but can
+    fall on different calendar dates, and isoformat() is cheap anyway.
+    """
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.isoformat()
+
+
 class XMLGenerator:
-    """Generate UBL XML from UBL models."""
+    """Generate UBL XML from UBL models.
+    
+    All elements are created with ``etree.SubElement`` on a parent that already
+    belongs to the invoice tree; ``generate_xml`` is the only place that calls
+    ``etree.Element``. Appending elements that were created in another document
+    makes lxml fix up namespaces on every move, which gets quadratic for large
+    invoices. Helpers that need a detached builder must use
+    ``parent.makeelement()`` so the new element shares the parent's document.
+    
+    The one exception is invoice lines: they are rendered to a single string,
+    parsed once and moved into the tree with one ``extend()`` call, which
+    costs a single linear pass instead of per-element Python calls.
+    """
     
     def __init__(self):
-        self.namespaces = {
-            None: "urn:oasis:names:specification:ubl:schema:xsd:Invoice-2",
-            "cac": "urn:oasis:names:specification:ubl:schema:xsd:CommonAggregateComponents-2",
-            "cbc": "urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2",
-            "xsi": "http://www.w3.org/2001/XMLSchema-instance"
-        }
-        
-        self.schema_location = (
-            "urn:oasis:names:specification:ubl:schema:xsd:Invoice-2 "
-            "http://docs.oasis-open.org/ubl/os-UBL-2.1/xsd/maindoc/UBL-Invoice-2.1.xsd"
-        )
+        # Shared module constants; identical for every generator instance
+        self.namespaces = NAMESPACES
+        self.schema_location = SCHEMA_LOCATION
+        
+        # Qualified names by (prefix, localname), filled on first use
+        self._qname_cache: Dict[Tuple[str, str], str] = {}
+    
+    def generate_xml(self, invoice: UBLInvoice, pretty: bool = False,
+                     now: Optional[datetime] = None) -> str:
+        """Generate UBL XML string from UBL invoice model.
+        
+        Output is compact by default since accounting software consumes the
+        XML programmatically; pass ``pretty=True`` for indented output meant
+        for people to read. ``now`` is used for missing issue and due dates
+        and defaults to the current time.
+        """
+        root = self._build_tree(invoice, now)
+        return etree.tostring(root, encoding='unicode', pretty_print=pretty)
     
-    def generate_xml(self, invoice: UBLInvoice) -> str:
-        """Generate UBL XML string from UBL invoice model."""
+    def generate_xml_bytes(self, invoice: UBLInvoice, pretty: bool = False,
+                           now: Optional[datetime] = None) -> bytes:
+        """Generate UTF-8 encoded UBL XML from UBL invoice model.
+        
+        Use this when the result is written to a file or passed on to
+        ``validate_xml``; it skips building the intermediate unicode string.
+        """
+        root = self._build_tree(invoice, now)
+        return etree.tostring(root, encoding='utf-8', pretty_print=pretty)
+    
+    def _build_tree(self, invoice: UBLInvoice, now: Optional[datetime] = None) -> etree.Element:
+        """Build the UBL element tree for an invoice."""
         
-        # Create root element
+        # Create root element (the only element not created via SubElement)
         root = etree.Element("Invoice", nsmap=self.namespaces)
         root.set("{http://www.w3.org/2001/XMLSchema-instance}schemaLocation", self.schema_location)
         
         # Add document-level information
-        self._add_document_info(root, invoice)
+        self._add_document_info(root, invoice, now)
         
         # Add parties
         self._add_parties(root, invoice)
@@ -49,50 +164,133 @@ class XMLGenerator:
         # Add invoice lines
         self._add_invoice_lines(root, invoice)
         
-        # Generate XML string
-        return etree.tostring(root, encoding='unicode', pretty_print=True)
+        return root
     
-    def _add_document_info(self, root: etree.Element, invoice: UBLInvoice):
+    def generate_many(self, invoices: List[UBLInvoice], workers: Optional[int] = None) -> List[str]:
+        """Generate UBL XML for many invoices in parallel worker processes.
+        
+        Each invoice is an independent, CPU-bound tree build, so the work is
+        spread over a process pool. Results are returned in input order.
+        The clock is read once, so every invoice without an issue or due
+        date gets the same fallback date.
+        
+        Args:
+            invoices: Invoices to render
+            workers: Number of worker processes (default: CPU count)
+            
+        Returns:
+            UBL XML strings, one per invoice
+        """
+        if not invoices:
+            return []
+        
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(invoices) // (workers * 4))
+        
+        generate = partial(self.generate_xml, now=datetime.now())
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(generate, invoices, chunksize=chunksize))
+    
+    def generate_xml_to_file(self, invoice: UBLInvoice, path: Union[str, Path],
+                             now: Optional[datetime] = None):
+        """Stream UBL XML for an invoice straight to a file.
+        
+        Produces the same document as ``generate_xml`` (plus an XML
+        declaration) but only keeps one section, or one invoice line, in
+        memory at a time, so peak memory does not grow with the number of
+        invoice lines.
+        """
+        with etree.xmlfile(str(path), encoding='utf-8') as xf:
+            xf.write_declaration()
+            with xf.element("Invoice", nsmap=self.namespaces,
+                            attrib={"{http://www.w3.org/2001/XMLSchema-instance}schemaLocation":
+                                    self.schema_location}):
+                # Sections are built on a scratch root, written out and discarded
+                scratch = etree.Element("Invoice", nsmap=self.namespaces)
+                
+                self._add_document_info(scratch, invoice, now)
+                self._flush_to_stream(xf, scratch)
+                
+                # Same order as generate_xml
+                for add_section in (self._add_parties,
+                                    self._add_payment_means,
+                                    self._add_tax_totals,
+                                    self._add_legal_monetary_total):
+                    add_section(scratch, invoice)
+                    self._flush_to_stream(xf, scratch)
+                
+                for line in invoice.invoice_lines:
+                    scratch.extend(self._parse_invoice_lines([line]))
+                    self._flush_to_stream(xf, scratch)
+    
+    def _flush_to_stream(self, xf, scratch: etree.Element):
+        """Write the children of scratch to an xmlfile writer and drop them."""
+        for child in scratch:
+            self._write_element(xf, child)
+        scratch.clear()
+    
+    def _write_element(self, xf, elem: etree.Element):
+        """Write an element through xmlfile contexts.
+        
+        ``xf.write(elem)`` would redeclare every in-scope namespace on each
+        written element; opening an ``xf.element`` context reuses the prefixes
+        declared on the streamed root instead.
+        """
+        with xf.element(elem.tag, attrib=dict(elem.attrib)):
+            if elem.text:
+                xf.write(elem.text)
+            for child in elem:
+                self._write_element(xf, child)
+    
+    def _add_document_info(self, root: etree.Element, invoice: UBLInvoice,
+                           now: Optional[datetime] = None):
         """Add document-level information to XML."""
         
+        # Read the clock at most once for both date fallbacks
+        now = now or datetime.now()
+        
         # CustomizationID
-        customization_id = etree.SubElement(root, self._qname("cbc", "CustomizationID"))
-        customization_id.text = invoice.customization_id
+        if invoice.customization_id:
+            customization_id = etree.SubElement(root, self._qname("cbc", "CustomizationID"))
+            customization_id.text = invoice.customization_id
         
         # ProfileID
-        profile_id = etree.SubElement(root, self._qname("cbc", "ProfileID"))
-        profile_id.text = invoice.profile_id
+        if invoice.profile_id:
+            profile_id = etree.SubElement(root, self._qname("cbc", "ProfileID"))
+            profile_id.text = invoice.profile_id
         
-        # ID
+        # ID (required)
         id_elem = etree.SubElement(root, self._qname("cbc", "ID"))
         id_elem.text = invoice.invoice_id
         
         # IssueDate (required)
         issue_date = etree.SubElement(root, self._qname("cbc", "IssueDate"))
         if invoice.issue_date:
-            issue_date.text = invoice.issue_date.strftime("%Y-%m-%d")
+            issue_date.text = _iso_date(invoice.issue_date)
         else:
-            issue_date.text = datetime.now().strftime("%Y-%m-%d")
+            issue_date.text = _iso_date(now.date())
         
         # DueDate (often required by accounting software)
         due_date = etree.SubElement(root, self._qname("cbc", "DueDate"))
         if invoice.due_date:
-            due_date.text = invoice.due_date.strftime("%Y-%m-%d")
+            due_date.text = _iso_date(invoice.due_date)
         else:
             # Default to 30 days from issue date
-            default_due = (invoice.issue_date or datetime.now()).replace(day=28)
-            due_date.text = default_due.strftime("%Y-%m-%d")
+            default_due = (invoice.issue_date or now).replace(day=28)
+            due_date.text = _iso_date(default_due)
         
-        # InvoiceTypeCode
+        # InvoiceTypeCode (required by EN16931/PEPPOL); an empty code falls
+        # back to the model default, commercial invoice
         invoice_type_code = etree.SubElement(root, self._qname("cbc", "InvoiceTypeCode"))
-        invoice_type_code.text = invoice.invoice_type_code
+        invoice_type_code.text = invoice.invoice_type_code or UBLInvoice.invoice_type_code
         
         # Note
         if invoice.note:
             note = etree.SubElement(root, self._qname("cbc", "Note"))
             note.text = invoice.note
         
-        # DocumentCurrencyCode
+        # DocumentCurrencyCode (required)
         currency_code = etree.SubElement(root, self._qname("cbc", "DocumentCurrencyCode"))
         currency_code.text = invoice.document_currency_code
         
@@ -171,33 +369,36 @@ class XMLGenerator:
     def _add_address(self, parent: etree.Element, address: UBLAddress):
         """Add address information to XML."""
         
+        SubElement = etree.SubElement
+        qn = self._qname
+        
         if address.street_name:
-            street_name = etree.SubElement(parent, self._qname("cbc", "StreetName"))
+            street_name = SubElement(parent, qn("cbc", "StreetName"))
             street_name.text = address.street_name
         
         if address.building_number:
-            building_number = etree.SubElement(parent, self._qname("cbc", "BuildingNumber"))
+            building_number = SubElement(parent, qn("cbc", "BuildingNumber"))
             building_number.text = address.building_number
         
         if address.city_name:
-            city_name = etree.SubElement(parent, self._qname("cbc", "CityName"))
+            city_name = SubElement(parent, qn("cbc", "CityName"))
             city_name.text = address.city_name
         
         if address.postal_zone:
-            postal_zone = etree.SubElement(parent, self._qname("cbc", "PostalZone"))
+            postal_zone = SubElement(parent, qn("cbc", "PostalZone"))
             postal_zone.text = address.postal_zone
         
         if address.country_code:
-            country = etree.SubElement(parent, self._qname("cac", "Country"))
-            country_code = etree.SubElement(country, self._qname("cbc", "IdentificationCode"))
+            country = SubElement(parent, qn("cac", "Country"))
+            country_code = SubElement(country, qn("cbc", "IdentificationCode"))
             country_code.text = address.country_code
         
-        # Add address lines
-        for line in address.address_lines:
-            if line.strip():
-                address_line = etree.SubElement(parent, self._qname("cbc", "AddressLine"))
-                line_elem = etree.SubElement(address_line, self._qname("cbc", "Line"))
-                line_elem.text = line.strip()
+        # Add address lines (AddressLine is an aggregate, only Line is basic)
+        for raw_line in address.address_lines:
+            line = raw_line.strip()
+            if line:
+                address_line = SubElement(parent, qn("cac", "AddressLine"))
+                SubElement(address_line, qn("cbc", "Line")).text = line
     
     def _add_payment_means(self, root: etree.Element, invoice: UBLInvoice):
         """Add payment means to XML."""
@@ -205,14 +406,15 @@ class XMLGenerator:
         for payment_means in invoice.payment_means:
             payment_means_elem = etree.SubElement(root, self._qname("cac", "PaymentMeans"))
             
-            # PaymentMeansCode
+            # PaymentMeansCode (required); an empty code falls back to the
+            # model default, bank transfer
             payment_means_code = etree.SubElement(payment_means_elem, self._qname("cbc", "PaymentMeansCode"))
-            payment_means_code.text = payment_means.payment_means_code
+            payment_means_code.text = payment_means.payment_means_code or UBLPaymentMeans.payment_means_code
             
             # PaymentDueDate
             if payment_means.payment_due_date:
                 payment_due_date = etree.SubElement(payment_means_elem, self._qname("cbc", "PaymentDueDate"))
-                payment_due_date.text = payment_means.payment_due_date.strftime("%Y-%m-%d")
+                payment_due_date.text = _iso_date(payment_means.payment_due_date)
             
             # PayeeFinancialAccount
             if payment_means.payee_financial_account_id:
@@ -238,51 +440,53 @@ class XMLGenerator:
     def _add_tax_totals(self, root: etree.Element, invoice: UBLInvoice):
         """Add tax totals to XML."""
         
+        SubElement = etree.SubElement
+        qn = self._qname
+        
         for tax_total in invoice.tax_total:
-            tax_total_elem = etree.SubElement(root, self._qname("cac", "TaxTotal"))
+            tax_total_elem = SubElement(root, qn("cac", "TaxTotal"))
             
             # TaxAmount
-            tax_amount = etree.SubElement(tax_total_elem, self._qname("cbc", "TaxAmount"))
-            tax_amount.text = format_amount_for_xml(tax_total.tax_amount)
-            tax_amount.set("currencyID", tax_total.currency_code)
+            SubElement(tax_total_elem, qn("cbc", "TaxAmount"),
+                       {"currencyID": tax_total.currency_code}).text = format_amount_for_xml(tax_total.tax_amount)
             
             # TaxSubtotals
             for tax_subtotal in tax_total.tax_subtotals:
-                tax_subtotal_elem = etree.SubElement(tax_total_elem, self._qname("cac", "TaxSubtotal"))
+                tax_subtotal_elem = SubElement(tax_total_elem, qn("cac", "TaxSubtotal"))
                 
                 # TaxableAmount
-                taxable_amount = etree.SubElement(tax_subtotal_elem, self._qname("cbc", "TaxableAmount"))
-                taxable_amount.text = format_amount_for_xml(tax_subtotal.taxable_amount)
-                taxable_amount.set("currencyID", tax_subtotal.currency_code)
+                currency = {"currencyID": tax_subtotal.currency_code}
+                SubElement(tax_subtotal_elem, qn("cbc", "TaxableAmount"),
+                           currency).text = format_amount_for_xml(tax_subtotal.taxable_amount)
                 
                 # TaxAmount
-                tax_amount_sub = etree.SubElement(tax_subtotal_elem, self._qname("cbc", "TaxAmount"))
-                tax_amount_sub.text = format_amount_for_xml(tax_subtotal.tax_amount)
-                tax_amount_sub.set("currencyID", tax_subtotal.currency_code)
+                SubElement(tax_subtotal_elem, qn("cbc", "TaxAmount"),
+                           currency).text = format_amount_for_xml(tax_subtotal.tax_amount)
                 
                 # TaxCategory
-                if tax_subtotal.tax_category:
-                    tax_category = etree.SubElement(tax_subtotal_elem, self._qname("cac", "TaxCategory"))
+                tc = tax_subtotal.tax_category
+                if tc:
+                    tax_category = SubElement(tax_subtotal_elem, qn("cac", "TaxCategory"))
                     
-                    category_id = etree.SubElement(tax_category, self._qname("cbc", "ID"))
-                    category_id.text = tax_subtotal.tax_category.tax_category_id
+                    category_id = SubElement(tax_category, qn("cbc", "ID"))
+                    category_id.text = tc.tax_category_id
                     
-                    if tax_subtotal.tax_category.tax_category_name:
-                        category_name = etree.SubElement(tax_category, self._qname("cbc", "Name"))
-                        category_name.text = tax_subtotal.tax_category.tax_category_name
+                    if tc.tax_category_name:
+                        category_name = SubElement(tax_category, qn("cbc", "Name"))
+                        category_name.text = tc.tax_category_name
                     
-                    if tax_subtotal.tax_category.percent:
-                        percent = etree.SubElement(tax_category, self._qname("cbc", "Percent"))
-                        percent.text = format_percentage_for_xml(tax_subtotal.tax_category.percent)
+                    if tc.percent:
+                        percent = SubElement(tax_category, qn("cbc", "Percent"))
+                        percent.text = format_percentage_for_xml(tc.percent)
                     
                     # TaxScheme
-                    tax_scheme = etree.SubElement(tax_category, self._qname("cac", "TaxScheme"))
-                    tax_scheme_id = etree.SubElement(tax_scheme, self._qname("cbc", "ID"))
-                    tax_scheme_id.text = tax_subtotal.tax_category.tax_scheme_id
+                    tax_scheme = SubElement(tax_category, qn("cac", "TaxScheme"))
+                    tax_scheme_id = SubElement(tax_scheme, qn("cbc", "ID"))
+                    tax_scheme_id.text = tc.tax_scheme_id
                     
-                    if tax_subtotal.tax_category.tax_scheme_name:
-                        tax_scheme_name = etree.SubElement(tax_scheme, self._qname("cbc", "Name"))
-                        tax_scheme_name.text = tax_subtotal.tax_category.tax_scheme_name
+                    if tc.tax_scheme_name:
+                        tax_scheme_name = SubElement(tax_scheme, qn("cbc", "Name"))
+                        tax_scheme_name.text = tc.tax_scheme_name
     
     def _add_legal_monetary_total(self, root: etree.Element, invoice: UBLInvoice):
         """Add legal monetary total to XML."""
@@ -290,111 +494,123 @@ class XMLGenerator:
         if not invoice.legal_monetary_total:
             return
         
+        totals = invoice.legal_monetary_total
+        currency = {"currencyID": totals.currency_code}
+        
         monetary_total = etree.SubElement(root, self._qname("cac", "LegalMonetaryTotal"))
         
         # LineExtensionAmount
-        line_extension = etree.SubElement(monetary_total, self._qname("cbc", "LineExtensionAmount"))
-        line_extension.text = format_amount_for_xml(invoice.legal_monetary_total.line_extension_amount)
-        line_extension.set("currencyID", invoice.legal_monetary_total.currency_code)
+        etree.SubElement(monetary_total, self._qname("cbc", "LineExtensionAmount"),
+                         currency).text = format_amount_for_xml(totals.line_extension_amount)
         
         # TaxExclusiveAmount
-        tax_exclusive = etree.SubElement(monetary_total, self._qname("cbc", "TaxExclusiveAmount"))
-        tax_exclusive.text = format_amount_for_xml(invoice.legal_monetary_total.tax_exclusive_amount)
-        tax_exclusive.set("currencyID", invoice.legal_monetary_total.currency_code)
+        etree.SubElement(monetary_total, self._qname("cbc", "TaxExclusiveAmount"),
+                         currency).text = format_amount_for_xml(totals.tax_exclusive_amount)
         
         # TaxInclusiveAmount
-        tax_inclusive = etree.SubElement(monetary_total, self._qname("cbc", "TaxInclusiveAmount"))
-        tax_inclusive.text = format_amount_for_xml(invoice.legal_monetary_total.tax_inclusive_amount)
-        tax_inclusive.set("currencyID", invoice.legal_monetary_total.currency_code)
+        etree.SubElement(monetary_total, self._qname("cbc", "TaxInclusiveAmount"),
+                         currency).text = format_amount_for_xml(totals.tax_inclusive_amount)
         
         # PayableAmount
-        payable_amount = etree.SubElement(monetary_total, self._qname("cbc", "PayableAmount"))
-        payable_amount.text = format_amount_for_xml(invoice.legal_monetary_total.payable_amount)
-        payable_amount.set("currencyID", invoice.legal_monetary_total.currency_code)
+        etree.SubElement(monetary_total, self._qname("cbc", "PayableAmount"),
+                         currency).text = format_amount_for_xml(totals.payable_amount)
     
     def _add_invoice_lines(self, root: etree.Element, invoice: UBLInvoice):
         """Add invoice lines to XML."""
         
-        for line in invoice.invoice_lines:
-            line_elem = etree.SubElement(root, self._qname("cac", "InvoiceLine"))
-            
-            # ID
-            line_id = etree.SubElement(line_elem, self._qname("cbc", "ID"))
-            line_id.text = line.line_id
-            
-            # InvoicedQuantity
-            invoiced_quantity = etree.SubElement(line_elem, self._qname("cbc", "InvoicedQuantity"))
-            invoiced_quantity.text = format_quantity_for_xml(line.invoiced_quantity)
-            invoiced_quantity.set("unitCode", line.unit_code)
-            
-            # LineExtensionAmount
-            line_extension = etree.SubElement(line_elem, self._qname("cbc", "LineExtensionAmount"))
-            line_extension.text = format_amount_for_xml(line.line_extension_amount)
-            line_extension.set("currencyID", line.currency_code)
+        if not invoice.invoice_lines:
+            return
+        
+        # One parse for all lines, then a single bulk move into the invoice
+        root.extend(self._parse_invoice_lines(invoice.invoice_lines))
+    
+    def _parse_invoice_lines(self, lines: List[UBLLineItem]) -> etree.Element:
+        """Parse rendered invoice lines into a container element."""
+        return etree.fromstring(self._render_invoice_lines(lines))
+    
+    def _render_invoice_lines(self, lines: List[UBLLineItem]) -> str:
+        """Render invoice lines as an XML fragment string.
+        
+        The lines are wrapped in a container element that declares the UBL
+        namespaces; its children are the cac:InvoiceLine elements. Text is
+        escaped here, so the string is always well-formed.
+        """
+        parts = [_LINES_OPEN % (self.namespaces[None], self.namespaces["cac"],
+                                self.namespaces["cbc"])]
+        append = parts.append
+        
+        for line in lines:
+            append(_LINE_HEAD % (
+                _xml_text(line.line_id),
+                _xml_attr(line.unit_code), format_quantity_for_xml(line.invoiced_quantity),
+                _xml_attr(line.currency_code), format_amount_for_xml(line.line_extension_amount),
+            ))
             
             # Item
-            item = etree.SubElement(line_elem, self._qname("cac", "Item"))
-            
             if line.item_description:
-                description = etree.SubElement(item, self._qname("cbc", "Description"))
-                description.text = line.item_description
+                append(_LINE_DESCRIPTION % _xml_text(line.item_description))
             
             if line.item_name:
-                name = etree.SubElement(item, self._qname("cbc", "Name"))
-                name.text = line.item_name
+                append(_LINE_NAME % _xml_text(line.item_name))
             
             # ClassifiedTaxCategory
-            if line.tax_category:
-                tax_category = etree.SubElement(item, self._qname("cac", "ClassifiedTaxCategory"))
+            tax_category = line.tax_category
+            if tax_category:
+                append(_LINE_TAX_CATEGORY_HEAD % _xml_text(tax_category.tax_category_id))
                 
-                category_id = etree.SubElement(tax_category, self._qname("cbc", "ID"))
-                category_id.text = line.tax_category.tax_category_id
-                
-                if line.tax_category.percent:
-                    percent = etree.SubElement(tax_category, self._qname("cbc", "Percent"))
-                    percent.text = format_percentage_for_xml(line.tax_category.percent)
+                if tax_category.percent:
+                    append(_LINE_PERCENT % format_percentage_for_xml(tax_category.percent))
                 
                 # TaxScheme
-                tax_scheme = etree.SubElement(tax_category, self._qname("cac", "TaxScheme"))
-                tax_scheme_id = etree.SubElement(tax_scheme, self._qname("cbc", "ID"))
-                tax_scheme_id.text = line.tax_category.tax_scheme_id
+                append(_LINE_TAX_CATEGORY_TAIL % _xml_text(tax_category.tax_scheme_id))
+            
+            append(_LINE_ITEM_TAIL)
             
             # Price
-            if line.price:
-                price = etree.SubElement(line_elem, self._qname("cac", "Price"))
-                
-                price_amount = etree.SubElement(price, self._qname("cbc", "PriceAmount"))
-                price_amount.text = format_amount_for_xml(line.price.price_amount)
-                price_amount.set("currencyID", line.price.currency_code)
-                
-                base_quantity = etree.SubElement(price, self._qname("cbc", "BaseQuantity"))
-                base_quantity.text = format_quantity_for_xml(line.price.base_quantity)
-                base_quantity.set("unitCode", line.price.unit_code)
+            price = line.price
+            if price:
+                append(_LINE_PRICE % (
+                    _xml_attr(price.currency_code), format_amount_for_xml(price.price_amount),
+                    _xml_attr(price.unit_code), format_quantity_for_xml(price.base_quantity),
+                ))
+            
+            append(_LINE_TAIL)
+        
+        append(_LINES_CLOSE)
+        return ''.join(parts)
     
     def _qname(self, prefix: str, localname: str) -> str:
         """Create qualified name for XML element."""
-        if prefix in self.namespaces:
-            return f"{{{self.namespaces[prefix]}}}{localname}"
-        return localname
+        key = (prefix, localname)
+        qname = self._qname_cache.get(key)
+        if qname is None:
+            if prefix in self.namespaces:
+                qname = f"{{{self.namespaces[prefix]}}}{localname}"
+            else:
+                qname = localname
+            self._qname_cache[key] = qname
+        return qname
     
-    def validate_xml(self, xml_string: str) -> bool:
-        """Validate generated XML against UBL schema."""
+    def validate_xml(self, xml: Union[str, bytes]) -> bool:
+        """Validate generated XML against UBL schema.
+        
+        Accepts the str from ``generate_xml`` or the UTF-8 bytes from
+        ``generate_xml_bytes``; bytes are parsed without re-encoding.
+        """
+        if isinstance(xml, str):
+            xml = xml.encode('utf-8')
+        
         try:
             # Parse XML
-            doc = etree.fromstring(xml_string.encode('utf-8'))
-            
-            # Basic validation - check required elements
-            required_elements = [
-                "{urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2}ID",
-                "{urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2}IssueDate",
-                "{urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2}DocumentCurrencyCode"
-            ]
-            
-            for element in required_elements:
-                if doc.find(element) is None:
-                    return False
-            
-            return True
-            
+            doc = etree.fromstring(xml)
         except etree.XMLSyntaxError:
-            return False
\ No newline at end of file
+            return False
+        
+        # Basic validation - check required elements in a single pass
+        missing = set(_REQUIRED_ELEMENTS)
+        for child in doc.iterchildren():
+            missing.discard(child.tag)
+            if not missing:
+                return True
+        
+        return False
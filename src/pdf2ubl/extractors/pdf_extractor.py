@@ -1,16 +1,115 @@
-"""Main PDF extraction module."""
+"""Main PDF extraction module.
+
+The PDF backends (PyMuPDF and pdfplumber) are imported where they are first
+used: pdfplumber pulls in pdfminer.six and Pillow, which a PyMuPDF-only run
+never needs.
+"""
 
 import logging
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union, Any
 from dataclasses import dataclass, field
 from datetime import datetime
-import fitz  # PyMuPDF
-import pdfplumber
 
 logger = logging.getLogger(__name__)
 
+# Documents with more pages than this are read by a pool of worker processes
+_PARALLEL_PAGE_THRESHOLD = 4
+
+# Field patterns for _extract_basic_info, tried in order. Each pattern is
+# paired with the literal keyword it starts with; the regex only runs when
+# the lowercased text contains that keyword ('' means always run).
+_INVOICE_NUMBER_RES = [(keyword, re.compile(p, re.IGNORECASE)) for keyword, p in (
+    ('factuur', r'factuur(?:nummer)?[:\s#-]*(\w+)'),
+    ('invoice', r'invoice(?:\s+number)?[:\s#-]*(\w+)'),
+    ('nr', r'nr[:\s.]*(\w+)'),
+    ('nummer', r'nummer[:\s]*(\w+)'),
+)]
+
+_DATE_RES = [(keyword, re.compile(p, re.IGNORECASE)) for keyword, p in (
+    ('datum', r'datum[:\s]*(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})'),
+    ('date', r'date[:\s]*(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})'),
+    ('', r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})'),
+)]
+
+_AMOUNT_RES = [(keyword, re.compile(p, re.IGNORECASE)) for keyword, p in (
+    ('totaal', r'totaal[:\s]*€?\s*(\d+[.,]\d{2})'),
+    ('total', r'total[:\s]*€?\s*(\d+[.,]\d{2})'),
+    ('bedrag', r'bedrag[:\s]*€?\s*(\d+[.,]\d{2})'),
+    ('€', r'€\s*(\d+[.,]\d{2})'),
+)]
+
+_VAT_NUMBER_RES = [(keyword, re.compile(p, re.IGNORECASE)) for keyword, p in (
+    ('btw', r'btw[:\s-]*(?:nr|nummer)?[:\s]*([A-Z]{2}\d{9}B\d{2})'),
+    ('vat', r'vat[:\s-]*(?:nr|number)?[:\s]*([A-Z]{2}\d{9}B\d{2})'),
+)]
+
+# The only non-ASCII characters re.IGNORECASE matches to ASCII letters, which
+# str.lower() does not map onto them: dotted and dotless I, long s and the
+# Kelvin sign. Folded before the keyword prefilter so it never skips a
+# pattern that would match.
+_IGNORECASE_ASCII_FOLDS = {'\u0130': 'i', '\u0131': 'i', '\u017f': 's', '\u212a': 'k'}
+_IGNORECASE_ASCII_FOLD_TABLE = str.maketrans(_IGNORECASE_ASCII_FOLDS)
+
+# Deletes currency symbols and whitespace (every character matching \s,
+# the last of which is U+3000) and turns decimal commas into points
+_NUMBER_CLEAN_TABLE = str.maketrans(
+    {',': '.', **dict.fromkeys('€$£' + ''.join(c for c in map(chr, range(0x3001)) if c.isspace()))}
+)
+_NUMBER_RE = re.compile(r'(\d+(?:\.\d{2})?)')
+_NON_ID_CHARS_RE = re.compile(r'[^\w\-/]')
+_NAME_PREFIX_RE = re.compile(r'^(van|de|het|b\.?v\.?|ltd\.?|inc\.?)\s+', re.IGNORECASE)
+
+# Typical invoice line item headers; matches if any occurs in a header cell
+_LINE_ITEM_HEADER_RE = re.compile('|'.join([
+    'beschrijving', 'description', 'omschrijving',
+    'aantal', 'quantity', 'qty',
+    'prijs', 'price', 'bedrag', 'amount'
+]))
+
+
+class _PageContent(NamedTuple):
+    """What PyMuPDF reads from a single page."""
+    text: str
+    blocks: List[Tuple]
+    has_drawings: bool
+    tables: List[List[List[str]]]
+
+
+def _read_page(page) -> _PageContent:
+    """Read text, positioned text and tables from a PyMuPDF page."""
+    # Reading order (top-to-bottom, left-to-right) like pdfplumber
+    page_text = page.get_text(sort=True)
+    
+    # Text blocks with positions; flat tuples, much lighter than "dict"
+    blocks = page.get_text("blocks")
+    
+    # Table detection works on ruling lines and rectangles, so pages without
+    # vector drawings cannot contain tables
+    has_drawings = bool(page.get_cdrawings())
+    tables = [table.extract() for table in page.find_tables()] if has_drawings else []
+    
+    return _PageContent(page_text, blocks, has_drawings, tables)
+
+
+def _read_pages(args: Tuple[str, List[int]]) -> List[_PageContent]:
+    """Read a range of pages in a worker process.
+    
+    Module level so it can be pickled by ProcessPoolExecutor; each worker
+    opens its own handle on the document.
+    """
+    import fitz  # PyMuPDF
+    
+    pdf_path, page_numbers = args
+    doc = fitz.open(pdf_path)
+    try:
+        return [_read_page(doc[page_num]) for page_num in page_numbers]
+    finally:
+        doc.close()
+
 
 @dataclass
 class ExtractedInvoiceData:
@@ -61,15 +160,19 @@ class ExtractedInvoiceData:
 class PDFExtractor:
     """Main PDF extractor class that coordinates different extraction methods."""
     
-    def __init__(self, use_ocr: bool = False, language: str = "nld"):
+    def __init__(self, use_ocr: bool = False, language: str = "nld",
+                 num_workers: Optional[int] = None):
         """Initialize PDF extractor.
         
         Args:
             use_ocr: Whether to use OCR for scanned PDFs
             language: Language code for OCR (default: Dutch)
+            num_workers: Worker processes for reading pages of large PDFs
+                (default: CPU count, at most 4; 1 disables the pool)
         """
         self.use_ocr = use_ocr
         self.language = language
+        self.num_workers = num_workers or min(os.cpu_count() or 1, 4)
         self.logger = logging.getLogger(__name__)
     
     def extract(self, pdf_path: Union[str, Path]) -> ExtractedInvoiceData:
@@ -91,21 +194,21 @@ class PDFExtractor:
         # Try multiple extraction methods
         data = ExtractedInvoiceData()
         
-        # Method 1: Try pdfplumber first (best for tables)
+        # Method 1: PyMuPDF for text (fast), pdfplumber only for table pages
         try:
-            data = self._extract_with_pdfplumber(pdf_path)
-            data.extraction_method = "pdfplumber"
-            self.logger.info("Successfully extracted with pdfplumber")
+            data = self._extract_with_pymupdf(pdf_path)
+            data.extraction_method = "pymupdf"
+            self.logger.info("Successfully extracted with PyMuPDF")
         except Exception as e:
-            self.logger.warning(f"pdfplumber extraction failed: {e}")
+            self.logger.warning(f"PyMuPDF extraction failed: {e}")
             
-            # Method 2: Fallback to PyMuPDF
+            # Method 2: Fallback to pdfplumber for text and tables
             try:
-                data = self._extract_with_pymupdf(pdf_path)
-                data.extraction_method = "pymupdf"
-                self.logger.info("Successfully extracted with PyMuPDF")
+                data = self._extract_with_pdfplumber(pdf_path)
+                data.extraction_method = "pdfplumber"
+                self.logger.info("Successfully extracted with pdfplumber")
             except Exception as e:
-                self.logger.error(f"PyMuPDF extraction failed: {e}")
+                self.logger.error(f"pdfplumber extraction failed: {e}")
                 
                 # Method 3: OCR fallback (if enabled)
                 if self.use_ocr:
@@ -124,15 +227,23 @@ class PDFExtractor:
     
     def _extract_with_pdfplumber(self, pdf_path: Path) -> ExtractedInvoiceData:
         """Extract using pdfplumber (good for tables and structured text)."""
+        import pdfplumber
+        
         data = ExtractedInvoiceData()
         
         with pdfplumber.open(pdf_path) as pdf:
-            # Extract text from all pages
-            all_text = ""
+            # Extract text from all pages; page texts and separators are
+            # joined once at the end, without a per-page concatenated copy
+            page_texts = []
             for page in pdf.pages:
                 page_text = page.extract_text()
                 if page_text:
-                    all_text += page_text + "\n"
+                    page_texts += (page_text, "\n")
+                
+                # Default table detection builds cells from ruling lines, so
+                # pages without lines, rectangles or curves have no tables
+                if not (page.lines or page.rects or page.curves):
+                    continue
                 
                 # Extract tables
                 tables = page.extract_tables()
@@ -141,6 +252,7 @@ class PDFExtractor:
                         data.tables.append(table)
                         self._process_table(table, data)
             
+            all_text = "".join(page_texts)
             data.raw_text = all_text
             
             # Extract basic information using regex patterns
@@ -149,30 +261,81 @@ class PDFExtractor:
         return data
     
     def _extract_with_pymupdf(self, pdf_path: Path) -> ExtractedInvoiceData:
-        """Extract using PyMuPDF (good for text positioning)."""
+        """Extract using PyMuPDF (fast text, positioning and table extraction).
+        
+        Tables come from PyMuPDF's native table finder. Pages that have
+        vector drawings but no table found by PyMuPDF are retried with
+        pdfplumber, so no table pdfplumber would detect is lost.
+        """
+        import fitz  # PyMuPDF
+        
         data = ExtractedInvoiceData()
         
         doc = fitz.open(pdf_path)
-        all_text = ""
         
         try:
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                page_text = page.get_text()
-                all_text += page_text + "\n"
-                
-                # Get text with positioning information
-                text_dict = page.get_text("dict")
-                self._process_positioned_text(text_dict, data)
-            
-            data.raw_text = all_text
-            self._extract_basic_info(all_text, data)
-            
+            page_count = len(doc)
+            if self.num_workers > 1 and page_count > _PARALLEL_PAGE_THRESHOLD:
+                pages = None
+            else:
+                pages = [_read_page(doc[page_num]) for page_num in range(page_count)]
         finally:
             doc.close()
         
+        if pages is None:
+            pages = self._read_pages_parallel(pdf_path, page_count)
+        
+        page_texts = []
+        page_tables = []
+        fallback_pages = []
+        
+        for page_num, page in enumerate(pages):
+            page_texts += (page.text, "\n")
+            self._process_positioned_text(page_num, page.blocks, data)
+            
+            page_tables.append(page.tables)
+            if page.has_drawings and not page.tables:
+                fallback_pages.append(page_num)
+        
+        all_text = "".join(page_texts)
+        data.raw_text = all_text
+        self._extract_basic_info(all_text, data)
+        
+        if fallback_pages:
+            for page_num, tables in self._extract_tables_with_pdfplumber(pdf_path, fallback_pages).items():
+                page_tables[page_num] = tables
+        
+        # Tables in page order
+        for tables in page_tables:
+            for table in tables:
+                if table:  # Only process non-empty tables
+                    data.tables.append(table)
+                    self._process_table(table, data)
+        
         return data
     
+    def _read_pages_parallel(self, pdf_path: Path, page_count: int) -> List[_PageContent]:
+        """Read all pages of a document with a pool of worker processes.
+        
+        Pages are split into one contiguous range per worker so each worker
+        opens the document once; results are returned in page order.
+        """
+        workers = min(self.num_workers, page_count)
+        chunk = -(-page_count // workers)  # ceiling division
+        ranges = [(str(pdf_path), list(range(start, min(start + chunk, page_count))))
+                  for start in range(0, page_count, chunk)]
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return [page for pages in executor.map(_read_pages, ranges) for page in pages]
+    
+    def _extract_tables_with_pdfplumber(self, pdf_path: Path,
+                                        page_numbers: List[int]) -> Dict[int, List[List[List[str]]]]:
+        """Extract tables from selected pages using pdfplumber, by page number."""
+        import pdfplumber
+        
+        with pdfplumber.open(pdf_path) as pdf:
+            return {page_num: pdf.pages[page_num].extract_tables() for page_num in page_numbers}
+    
     def _extract_with_ocr(self, pdf_path: Path) -> ExtractedInvoiceData:
         """Extract using OCR (fallback for scanned PDFs)."""
         # This would require additional OCR libraries like tesseract
@@ -184,30 +347,27 @@ class PDFExtractor:
     def _extract_basic_info(self, text: str, data: ExtractedInvoiceData):
         """Extract basic invoice information using regex patterns."""
         
+        # Keyword prefilter: a substring check is far cheaper than a failed
+        # case-insensitive regex scan over the whole document
+        lowered = text.lower()
+        if not text.isascii() and any(char in text for char in _IGNORECASE_ASCII_FOLDS):
+            lowered = text.translate(_IGNORECASE_ASCII_FOLD_TABLE).lower()
+        
         # Invoice number patterns
-        invoice_patterns = [
-            r'factuur(?:nummer)?[:\s#-]*(\w+)',
-            r'invoice(?:\s+number)?[:\s#-]*(\w+)',
-            r'nr[:\s.]*(\w+)',
-            r'nummer[:\s]*(\w+)',
-        ]
-        
-        for pattern in invoice_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for keyword, pattern in _INVOICE_NUMBER_RES:
+            if keyword not in lowered:
+                continue
+            match = pattern.search(text)
             if match:
                 data.invoice_number = match.group(1)
                 data.confidence_scores['invoice_number'] = 0.8
                 break
         
         # Date patterns
-        date_patterns = [
-            r'datum[:\s]*(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
-            r'date[:\s]*(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
-            r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for keyword, pattern in _DATE_RES:
+            if keyword not in lowered:
+                continue
+            match = pattern.search(text)
             if match:
                 try:
                     date_str = match.group(1)
@@ -225,49 +385,34 @@ class PDFExtractor:
                     continue
         
         # Amount patterns
-        amount_patterns = [
-            r'totaal[:\s]*€?\s*(\d+[.,]\d{2})',
-            r'total[:\s]*€?\s*(\d+[.,]\d{2})',
-            r'bedrag[:\s]*€?\s*(\d+[.,]\d{2})',
-            r'€\s*(\d+[.,]\d{2})',
-        ]
-        
-        for pattern in amount_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                # Take the last/largest amount found
-                amounts = []
-                for match in matches:
-                    try:
-                        amount_str = match.replace(',', '.')
-                        amounts.append(float(amount_str))
-                    except ValueError:
-                        continue
-                
-                if amounts:
-                    data.total_amount = max(amounts)
-                    data.confidence_scores['total_amount'] = 0.6
-                    break
+        for keyword, pattern in _AMOUNT_RES:
+            if keyword not in lowered:
+                continue
+            # Take the largest amount found; the pattern only matches
+            # digits with a two-digit decimal part, so float() cannot fail
+            amount = max((float(match.group(1).replace(',', '.'))
+                          for match in pattern.finditer(text)), default=None)
+            if amount is not None:
+                data.total_amount = amount
+                data.confidence_scores['total_amount'] = 0.6
+                break
         
         # VAT number patterns
-        vat_patterns = [
-            r'btw[:\s-]*(?:nr|nummer)?[:\s]*([A-Z]{2}\d{9}B\d{2})',
-            r'vat[:\s-]*(?:nr|number)?[:\s]*([A-Z]{2}\d{9}B\d{2})',
-        ]
-        
-        for pattern in vat_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for keyword, pattern in _VAT_NUMBER_RES:
+            if keyword not in lowered:
+                continue
+            match = pattern.search(text)
             if match:
                 data.supplier_vat_number = match.group(1)
                 data.confidence_scores['supplier_vat_number'] = 0.9
                 break
         
         # Company name (first line usually)
-        lines = text.split('\n')
-        for line in lines[:10]:  # Check first 10 lines
-            line = line.strip()
-            if len(line) > 3 and not re.match(r'^\d', line):
-                if not data.supplier_name:
+        if not data.supplier_name:
+            # Only split off the first 10 lines, not the whole document
+            for line in text.split('\n', 10)[:10]:
+                line = line.strip()
+                if len(line) > 3 and not line[0].isdecimal():
                     data.supplier_name = line
                     data.confidence_scores['supplier_name'] = 0.5
                     break
@@ -281,14 +426,8 @@ class PDFExtractor:
         header = table[0] if table else []
         
         # Look for typical invoice line item headers
-        line_item_indicators = [
-            'beschrijving', 'description', 'omschrijving',
-            'aantal', 'quantity', 'qty',
-            'prijs', 'price', 'bedrag', 'amount'
-        ]
-        
         has_line_items = any(
-            any(indicator in cell.lower() for indicator in line_item_indicators)
+            _LINE_ITEM_HEADER_RE.search(cell.lower())
             for cell in header if cell
         )
         
@@ -304,25 +443,31 @@ class PDFExtractor:
                     }
                     data.line_items.append(line_item)
     
-    def _process_positioned_text(self, text_dict: Dict, data: ExtractedInvoiceData):
-        """Process text with positioning information from PyMuPDF."""
-        # This could be enhanced to use text positioning for better extraction
-        # For now, just extract text content
-        pass
+    def _process_positioned_text(self, page_num: int, blocks: List[Tuple], data: ExtractedInvoiceData):
+        """Collect text blocks with positioning information from PyMuPDF.
+        
+        Stored in ``data.positioned_text['blocks']`` as
+        ``(page_num, x0, y0, x1, y1, text)`` tuples; image blocks are skipped.
+        """
+        if data.positioned_text is None:
+            data.positioned_text = {'blocks': []}
+        
+        add_block = data.positioned_text['blocks'].append
+        for x0, y0, x1, y1, text, _block_no, block_type in blocks:
+            if block_type == 0:  # Text block
+                add_block((page_num, x0, y0, x1, y1, text))
     
     def _extract_number(self, text: str) -> float:
         """Extract numeric value from text."""
         if not text:
             return 0.0
         
-        # Remove currency symbols and whitespace
-        cleaned = re.sub(r'[€$£\s]', '', text)
-        
-        # Handle comma as decimal separator
-        cleaned = cleaned.replace(',', '.')
+        # Remove currency symbols and whitespace, handle comma as decimal
+        # separator; one C-level pass
+        cleaned = text.translate(_NUMBER_CLEAN_TABLE)
         
         # Extract number
-        match = re.search(r'(\d+(?:\.\d{2})?)', cleaned)
+        match = _NUMBER_RE.search(cleaned)
         if match:
             try:
                 return float(match.group(1))
@@ -336,7 +481,7 @@ class PDFExtractor:
         
         # Validate and clean invoice number
         if data.invoice_number:
-            data.invoice_number = re.sub(r'[^\w\-/]', '', data.invoice_number)
+            data.invoice_number = _NON_ID_CHARS_RE.sub('', data.invoice_number)
         
         # Validate amounts
         if data.total_amount and data.total_amount < 0:
@@ -353,7 +498,7 @@ class PDFExtractor:
         if data.supplier_name:
             data.supplier_name = data.supplier_name.strip()
             # Remove common prefixes/suffixes
-            data.supplier_name = re.sub(r'^(van|de|het|b\.?v\.?|ltd\.?|inc\.?)\s+', '', data.supplier_name, flags=re.IGNORECASE)
+            data.supplier_name = _NAME_PREFIX_RE.sub('', data.supplier_name)
     
     def get_extraction_quality(self, data: ExtractedInvoiceData) -> float:
         """Calculate overall extraction quality score."""
@@ -1,14 +1,102 @@
 """Table extraction utilities for PDF processing."""
 
 import re
+from functools import lru_cache
+from itertools import compress, count
 from typing import List, Dict, Optional, Tuple, Any
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
 
 
+# Deletes currency symbols and whitespace (every character matching \s,
+# the last of which is U+3000)
+_CURRENCY_STRIP_TABLE = str.maketrans(
+    dict.fromkeys('€$£' + ''.join(c for c in map(chr, range(0x3001)) if c.isspace()))
+)
+_NUMBER_RE = re.compile(r'(\d+(?:\.\d+)?)')
+_PERCENTAGE_RE = re.compile(r'(\d+(?:[.,]\d+)?)\s*%')
+_NUMERIC_CHARS = frozenset('0123456789€$£%')
+
+# Distinct header rows remembered per extractor before the cache is reset
+_HEADER_CACHE_SIZE = 256
+
+
+def _keyword_re(keywords: List[str]) -> re.Pattern:
+    """Compile keywords into one pattern that finds any of them as a substring.
+    
+    The keywords are merged into a trie first, so shared prefixes such as
+    'totaal'/'total' or 'btw'/'bedrag' are matched once per position instead
+    of once per keyword.
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}  # End of a keyword
+    
+    return re.compile(_trie_pattern(trie))
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """Render a keyword trie node as a regex."""
+    branches = [re.escape(char) + _trie_pattern(child)
+                for char, child in sorted(node.items()) if char]
+    
+    if not branches:
+        return ''
+    
+    # Only existence is tested, so a keyword ending here makes the rest optional
+    ends_here = '' in node
+    if len(branches) == 1 and not ends_here:
+        return branches[0]
+    
+    group = '(?:' + '|'.join(branches) + ')'
+    return group + '?' if ends_here else group
+
+
+# Header keywords per line item field, in mapping priority order
+_LINE_ITEM_FIELD_RES = [
+    ('description', _keyword_re(['beschrijving', 'description', 'omschrijving'])),
+    ('quantity', _keyword_re(['aantal', 'quantity', 'qty'])),
+    ('unit_price', _keyword_re(['prijs', 'price', 'unit'])),
+    ('total_amount', _keyword_re(['totaal', 'total', 'bedrag'])),
+    ('vat_rate', _keyword_re(['btw', 'vat', 'tax'])),
+]
+
+# Row labels in summary tables
+_SUBTOTAL_LABEL_RE = _keyword_re(['subtotal', 'subtotaal', 'netto'])
+_VAT_LABEL_RE = _keyword_re(['btw', 'vat', 'tax'])
+_TOTAL_LABEL_RE = _keyword_re(['totaal', 'total', 'bruto'])
+_TOTAL_INDICATOR_RE = _keyword_re(['totaal', 'total', 'subtotal', 'subtotaal', 'btw', 'vat'])
+
+
+@lru_cache(maxsize=256)
+def _line_item_header_mapping(headers: Tuple[str, ...]) -> Dict[int, str]:
+    """Map column indices to line item field names for a header row.
+    
+    Cached because invoices from the same supplier repeat the same header
+    row; callers get a shared dict and must copy it before changing it.
+    """
+    mapping = {}
+    
+    for i, header in enumerate(headers):
+        header_lower = header.lower()
+        
+        # First field whose keywords occur in the header wins
+        for field_name, pattern in _LINE_ITEM_FIELD_RES:
+            if pattern.search(header_lower):
+                mapping[i] = field_name
+                break
+    
+    return mapping
+
+
 @dataclass
 class TableCell:
     """Represents a cell in a table."""
+    __slots__ = ('text', 'x', 'y', 'width', 'height', 'row', 'col')
+    
     text: str
     x: float
     y: float
@@ -21,6 +109,8 @@ class TableCell:
 @dataclass
 class ExtractedTable:
     """Represents an extracted table with metadata."""
+    __slots__ = ('headers', 'rows', 'table_type', 'confidence', 'x', 'y', 'width', 'height')
+    
     headers: List[str]
     rows: List[List[str]]
     table_type: str  # 'line_items', 'summary', 'unknown'
@@ -48,6 +138,14 @@ class TableExtractor:
             'btw', 'vat', 'tax', 'belasting',
             'totaal', 'total', 'bruto', 'gross'
         ]
+        
+        # One C-level scan per cell instead of a Python loop over keywords
+        self._line_item_header_re = _keyword_re(self.line_item_headers)
+        self._summary_header_re = _keyword_re(self.summary_headers)
+        self._any_header_re = _keyword_re(self.line_item_headers + self.summary_headers)
+        
+        # Header keyword hits by header row; suppliers repeat their headers
+        self._header_hits_cache: Dict[Tuple[str, ...], Tuple[int, int, int]] = {}
     
     def extract_tables(self, tables: List[List[List[str]]]) -> List[ExtractedTable]:
         """Extract and classify tables from raw table data.
@@ -68,11 +166,14 @@ class TableExtractor:
             headers = self._clean_headers(table[0])
             rows = [self._clean_row(row) for row in table[1:] if row]
             
+            # Numeric cells, computed once for classification and confidence
+            numeric_mask = self._numeric_mask(rows)
+            
             # Classify table type
-            table_type = self._classify_table(headers, rows)
+            table_type = self._classify_table(headers, rows, numeric_mask)
             
             # Calculate confidence
-            confidence = self._calculate_table_confidence(headers, rows, table_type)
+            confidence = self._calculate_table_confidence(headers, rows, table_type, numeric_mask)
             
             extracted_table = ExtractedTable(
                 headers=headers,
@@ -129,8 +230,8 @@ class TableExtractor:
         cleaned = []
         for header in headers:
             if header:
-                # Remove extra whitespace and convert to lowercase
-                cleaned_header = re.sub(r'\s+', ' ', header.strip().lower())
+                # Collapse whitespace runs and convert to lowercase
+                cleaned_header = ' '.join(header.lower().split())
                 cleaned.append(cleaned_header)
             else:
                 cleaned.append('')
@@ -141,33 +242,27 @@ class TableExtractor:
         cleaned = []
         for cell in row:
             if cell:
-                # Remove extra whitespace
-                cleaned_cell = re.sub(r'\s+', ' ', cell.strip())
+                # Collapse whitespace runs (split() also strips the ends)
+                cleaned_cell = ' '.join(cell.split())
                 cleaned.append(cleaned_cell)
             else:
                 cleaned.append('')
         return cleaned
     
-    def _classify_table(self, headers: List[str], rows: List[List[str]]) -> str:
+    def _classify_table(self, headers: List[str], rows: List[List[str]],
+                        numeric_mask: Optional[List[List[bool]]] = None) -> str:
         """Classify table type based on headers and content."""
         
-        # Check for line items table
-        line_item_score = 0
-        for header in headers:
-            if any(indicator in header.lower() for indicator in self.line_item_headers):
-                line_item_score += 1
-        
-        # Check for summary table
-        summary_score = 0
-        for header in headers:
-            if any(indicator in header.lower() for indicator in self.summary_headers):
-                summary_score += 1
+        # Check for line items and summary tables
+        line_item_score, summary_score, _ = self._header_keyword_hits(headers)
         
         # Also check row content for classification
         if rows:
             # Look for numeric content (typical in both types)
-            numeric_content = sum(1 for row in rows for cell in row if self._is_numeric(cell))
-            total_content = sum(len(row) for row in rows)
+            if numeric_mask is None:
+                numeric_mask = self._numeric_mask(rows)
+            numeric_content = sum(map(sum, numeric_mask))
+            total_content = sum(map(len, rows))
             
             if total_content > 0:
                 numeric_ratio = numeric_content / total_content
@@ -188,17 +283,36 @@ class TableExtractor:
         else:
             return 'unknown'
     
-    def _calculate_table_confidence(self, headers: List[str], rows: List[List[str]], table_type: str) -> float:
+    def _header_keyword_hits(self, headers: List[str]) -> Tuple[int, int, int]:
+        """Count headers with line item, summary and any known keywords.
+        
+        Cached by header row, so tables from a supplier that was seen before
+        skip the keyword scans.
+        """
+        key = tuple(headers)
+        hits = self._header_hits_cache.get(key)
+        
+        if hits is None:
+            lowered = [header.lower() for header in headers]
+            hits = (
+                sum(1 for header in lowered if self._line_item_header_re.search(header)),
+                sum(1 for header in lowered if self._summary_header_re.search(header)),
+                sum(1 for header in lowered if self._any_header_re.search(header)),
+            )
+            
+            if len(self._header_hits_cache) >= _HEADER_CACHE_SIZE:
+                self._header_hits_cache.clear()
+            self._header_hits_cache[key] = hits
+        
+        return hits
+    
+    def _calculate_table_confidence(self, headers: List[str], rows: List[List[str]], table_type: str,
+                                    numeric_mask: Optional[List[List[bool]]] = None) -> float:
         """Calculate confidence score for table classification."""
         confidence = 0.5
         
         # Base confidence on header recognition
-        recognized_headers = 0
-        all_indicators = self.line_item_headers + self.summary_headers
-        
-        for header in headers:
-            if any(indicator in header.lower() for indicator in all_indicators):
-                recognized_headers += 1
+        _, _, recognized_headers = self._header_keyword_hits(headers)
         
         if headers:
             header_ratio = recognized_headers / len(headers)
@@ -211,7 +325,7 @@ class TableExtractor:
                 confidence += 0.2
             
             # Check for typical line item patterns
-            if self._has_line_item_patterns(rows):
+            if self._has_line_item_patterns(rows, numeric_mask):
                 confidence += 0.2
         
         elif table_type == 'summary':
@@ -257,43 +371,23 @@ class TableExtractor:
                 value = row[1].strip()
                 
                 # Map common summary fields
-                if any(indicator in key for indicator in ['subtotal', 'subtotaal', 'netto']):
+                if _SUBTOTAL_LABEL_RE.search(key):
                     summary['subtotal'] = self._parse_amount(value)
                 
-                elif any(indicator in key for indicator in ['btw', 'vat', 'tax']):
+                elif _VAT_LABEL_RE.search(key):
                     if '%' in value:
                         summary['vat_rate'] = self._parse_percentage(value)
                     else:
                         summary['vat_amount'] = self._parse_amount(value)
                 
-                elif any(indicator in key for indicator in ['totaal', 'total', 'bruto']):
+                elif _TOTAL_LABEL_RE.search(key):
                     summary['total_amount'] = self._parse_amount(value)
         
         return summary
     
     def _map_line_item_headers(self, headers: List[str]) -> Dict[int, str]:
         """Map table column indices to field names."""
-        mapping = {}
-        
-        for i, header in enumerate(headers):
-            header_lower = header.lower()
-            
-            if any(indicator in header_lower for indicator in ['beschrijving', 'description', 'omschrijving']):
-                mapping[i] = 'description'
-            
-            elif any(indicator in header_lower for indicator in ['aantal', 'quantity', 'qty']):
-                mapping[i] = 'quantity'
-            
-            elif any(indicator in header_lower for indicator in ['prijs', 'price', 'unit']):
-                mapping[i] = 'unit_price'
-            
-            elif any(indicator in header_lower for indicator in ['totaal', 'total', 'bedrag']):
-                mapping[i] = 'total_amount'
-            
-            elif any(indicator in header_lower for indicator in ['btw', 'vat', 'tax']):
-                mapping[i] = 'vat_rate'
-        
-        return mapping
+        return dict(_line_item_header_mapping(tuple(headers)))
     
     def _parse_cell_value(self, cell: str, field_name: str) -> Any:
         """Parse cell value based on expected field type."""
@@ -318,18 +412,19 @@ class TableExtractor:
             return None
         
         # Remove currency symbols and spaces
-        cleaned = re.sub(r'[€$£\s]', '', text)
-        
-        # Handle comma as decimal separator
-        if ',' in cleaned and '.' not in cleaned:
-            cleaned = cleaned.replace(',', '.')
-        elif ',' in cleaned and '.' in cleaned:
-            # Handle format like "1.234,56" (European format)
-            if cleaned.rfind(',') > cleaned.rfind('.'):
+        cleaned = text.translate(_CURRENCY_STRIP_TABLE)
+        
+        # The last separator is the decimal one, the other groups thousands:
+        # "1.234,56" (European) and "1,234.56" both become "1234.56"
+        comma = cleaned.rfind(',')
+        if comma != -1:
+            if comma > cleaned.rfind('.'):
                 cleaned = cleaned.replace('.', '').replace(',', '.')
+            else:
+                cleaned = cleaned.replace(',', '')
         
         # Extract numeric value
-        match = re.search(r'(\d+(?:\.\d+)?)', cleaned)
+        match = _NUMBER_RE.search(cleaned)
         if match:
             try:
                 return float(match.group(1))
@@ -344,7 +439,7 @@ class TableExtractor:
             return None
         
         # Extract numeric value before %
-        match = re.search(r'(\d+(?:[.,]\d+)?)\s*%', text)
+        match = _PERCENTAGE_RE.search(text)
         if match:
             try:
                 value = match.group(1).replace(',', '.')
@@ -360,19 +455,29 @@ class TableExtractor:
             return False
         
         # Check for numbers, currency symbols, percentages
-        return bool(re.search(r'[\d€$£%]', text))
+        return not _NUMERIC_CHARS.isdisjoint(text)
     
-    def _has_line_item_patterns(self, rows: List[List[str]]) -> bool:
+    def _numeric_mask(self, rows: List[List[str]]) -> List[List[bool]]:
+        """Flag the numeric cells of each row.
+        
+        Same test as ``_is_numeric``, inlined to avoid a method call per cell.
+        """
+        has_no_numeric = _NUMERIC_CHARS.isdisjoint
+        return [[bool(cell) and not has_no_numeric(cell) for cell in row] for row in rows]
+    
+    def _has_line_item_patterns(self, rows: List[List[str]],
+                                numeric_mask: Optional[List[List[bool]]] = None) -> bool:
         """Check if rows contain typical line item patterns."""
         if not rows:
             return False
         
+        if numeric_mask is None:
+            numeric_mask = self._numeric_mask(rows)
+        
         # Look for numeric values in multiple columns (typical of line items)
         numeric_columns = set()
-        for row in rows:
-            for i, cell in enumerate(row):
-                if self._is_numeric(cell):
-                    numeric_columns.add(i)
+        for row_mask in numeric_mask:
+            numeric_columns.update(compress(count(), row_mask))
         
         return len(numeric_columns) >= 2
     
@@ -382,11 +487,9 @@ class TableExtractor:
             return False
         
         # Look for words indicating totals
-        total_indicators = ['totaal', 'total', 'subtotal', 'subtotaal', 'btw', 'vat']
-        
         for row in rows:
             for cell in row:
-                if cell and any(indicator in cell.lower() for indicator in total_indicators):
+                if cell and _TOTAL_INDICATOR_RE.search(cell.lower()):
                     return True
         
         return False
\ No newline at end of file
@@ -1,11 +1,232 @@
 """Text extraction utilities for PDF processing."""
 
+import os
 import re
-from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
 
+# Extraction patterns, tried in order by the extract_* methods
+_DATE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'\b(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})\b',
+    r'\b(\d{1,2}\s+(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\s+\d{2,4})\b',
+    r'\b(\d{1,2}\s+(januari|februari|maart|april|mei|juni|juli|augustus|september|oktober|november|december)\s+\d{2,4})\b',
+)]
+
+# Every date pattern starts with a word-initial one- or two-digit number,
+# followed by [-/] and a digit (numeric dates) or by whitespace and a letter
+# (month names). This finds all such start positions in a single scan and
+# names the kind in lastgroup; it only consumes the first digit, so no start
+# position inside a candidate is skipped.
+_DATE_START_RE = re.compile(r'\b\d(?=\d?(?:(?P<numeric>[-/]\d)|\s+(?P<month>[^\W\d_])))')
+
+# Start kind (a _DATE_START_RE group name) of each pattern in _DATE_PATTERNS
+_DATE_PATTERN_STARTS = ['numeric', 'month', 'month']
+
+# The (?<!\d) and (?![-\s]) guards below keep the scans linear in the text
+# length without changing any match: they only cut off backtracking paths
+# that cannot lead to an earlier or different match (a run of digits is
+# always matched from its first digit, and a run of separators after the
+# keyword is always consumed in full).
+_AMOUNT_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'€\s*(\d+[.,]\d{2})',
+    r'(?<!\d)(\d+[.,]\d{2})\s*€',
+    r'\b(\d+[.,]\d{2})\b',
+)]
+
+_VAT_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'(?:BTW|VAT)[-\s]*(?![-\s])(?:nr|nummer|number)?[:\s]*([A-Z]{2}\d{9}B\d{2})',
+    r'([A-Z]{2}\d{9}B\d{2})',
+)]
+
+_INVOICE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'(?:factuur|invoice)[-\s]*(?![-\s])(?:nr|nummer|number)?[:\s#]*(\w+)',
+    r'(?:nr|no)[:\s.]*(\w+)',
+)]
+
+# Shortest text any pattern of each kind can match; shorter texts (empty
+# pages, small OCR regions) are skipped without scanning
+_MIN_LEN = {'date': 6, 'amount': 4, 'vat': 14, 'invoice': 3}
+
+# Group 1 of a match, and the whole match with group 1
+_FIRST_GROUP = itemgetter(1)
+_MATCH_AND_FIRST_GROUP = itemgetter(0, 1)
+
+# Date shapes _parse_date builds directly instead of trying strptime formats
+_NUMERIC_DATE_RE = re.compile(r'([0-9]{1,2})([-/])([0-9]{1,2})\2([0-9]{2}|[0-9]{4})')
+_MONTH_NAME_DATE_RE = re.compile(r'([0-9]{1,2})\s+(\w+)\s+([0-9]{2,4})')
+
+# English (full and abbreviated) and Dutch month names, lowercased
+_MONTH_NUMBERS = {name: number for number, names in enumerate((
+    ('january', 'jan', 'januari'),
+    ('february', 'feb', 'februari'),
+    ('march', 'mar', 'maart'),
+    ('april', 'apr'),
+    ('may', 'mei'),
+    ('june', 'jun', 'juni'),
+    ('july', 'jul', 'juli'),
+    ('august', 'aug', 'augustus'),
+    ('september', 'sep'),
+    ('october', 'oct', 'oktober'),
+    ('november', 'nov'),
+    ('december', 'dec'),
+), 1) for name in names}
+
+# Helper patterns for parsing, validation and confidence scoring
+# Deletes currency symbols and whitespace (every character matching \s,
+# the last of which is U+3000)
+_AMOUNT_STRIP_TABLE = str.maketrans(
+    '', '', '€$£¥' + ''.join(c for c in map(chr, range(0x3001)) if c.isspace())
+)
+_VAT_NUMBER_RE = re.compile(r'^[A-Z]{2}\d{9}B\d{2}$')
+_DUTCH_POSTAL_CODE_RE = re.compile(r'\d{4}\s*[A-Z]{2}')
+
+# Address line checks for extract_addresses. Each is scanned over the whole
+# text and never matches across a line break, so the lines it matches in are
+# the (stripped) lines it would match on its own.
+# An address starts with a house number or a Dutch/English street type; the
+# lookahead keeps the house number's whitespace inside the stripped line.
+_ADDRESS_START_RE = re.compile(
+    r'\d[a-zA-Z]?[^\S\n](?=[^\S\n]*\S)'
+    r'|(?i:straat|laan|weg|plein|kade|gracht|street|avenue|road|lane|drive)'
+)
+# Dutch (\d{4}\s*[A-Z]{2}) and international (\d{4,5}) postal codes
+# both contain four consecutive digits
+_POSTAL_CODE_RE = re.compile(r'\d{4}')
+# Invoice field labels, matched against the lowercased text
+_INVOICE_FIELD_RE = re.compile('|'.join([
+    'factuur', 'invoice', 'bedrag', 'amount', 'btw', 'vat',
+    'datum', 'date', 'totaal', 'total', 'nummer', 'number'
+]))
+# Confidence indicators, matched against lowercased text
+_MONTH_INDICATOR_RE = re.compile('|'.join([
+    'jan', 'feb', 'mar', 'apr', 'may', 'jun',
+    'jul', 'aug', 'sep', 'oct', 'nov', 'dec'
+]))
+_STREET_INDICATOR_RE = re.compile('|'.join([
+    'straat', 'laan', 'weg', 'plein', 'street', 'avenue', 'road'
+]))
+_FULL_YEAR_DATE_RE = re.compile(r'\d{1,2}[-/]\d{1,2}[-/]\d{4}')
+_TWO_DIGIT_END_RE = re.compile(r'\d{2}$')
+_UPPERCASE_RE = re.compile(r'[A-Z]')
+_DIGIT_RE = re.compile(r'\d')
+
+
+# strptime formats tried for dates without a fast path in _parse_date
+_DATE_FORMATS = [
+    '%d-%m-%Y', '%d/%m/%Y', '%d-%m-%y', '%d/%m/%y',
+    '%Y-%m-%d', '%Y/%m/%d',
+    '%d %B %Y', '%d %b %Y',
+]
+
+# Dutch month names mapped to English for strptime's %B directive
+_DUTCH_MONTHS = {
+    'januari': 'january', 'februari': 'february', 'maart': 'march',
+    'april': 'april', 'mei': 'may', 'juni': 'june',
+    'juli': 'july', 'augustus': 'august', 'september': 'september',
+    'oktober': 'october', 'november': 'november', 'december': 'december'
+}
+
+
+def _build_date(year, month, day) -> Optional[datetime]:
+    """Build a datetime from numbers or digit strings, None if invalid."""
+    try:
+        return datetime(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _parse_date(date_str: str) -> Optional[datetime]:
+    """Parse date string into datetime object.
+    
+    Numeric dates and dates with a known month name are built from
+    their parts directly, with the same results as _DATE_FORMATS; those
+    remain the fallback for any other shape. Results are memoized since
+    invoices repeat the same dates.
+    """
+    match = _NUMERIC_DATE_RE.fullmatch(date_str)
+    if match:
+        day, _, month, year = match.groups()
+        if len(year) == 2:
+            # strptime's %y pivot: 69-99 -> 19xx, 00-68 -> 20xx
+            year = int(year)
+            year += 1900 if year >= 69 else 2000
+        return _build_date(year, month, day)
+    
+    match = _MONTH_NAME_DATE_RE.fullmatch(date_str)
+    if match:
+        day, month_name, year = match.groups()
+        month = _MONTH_NUMBERS.get(month_name.lower())
+        if month:
+            # Month name formats only take a four-digit year
+            return _build_date(year, month, day) if len(year) == 4 else None
+    
+    # Handle Dutch month names
+    date_str = date_str.lower()
+    for dutch, english in _DUTCH_MONTHS.items():
+        date_str = date_str.replace(dutch, english)
+    
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _parse_amount(amount_str: str) -> Optional[float]:
+    """Parse amount string into float (memoized like _parse_date)."""
+    try:
+        # Remove currency symbols and whitespace
+        cleaned = amount_str.translate(_AMOUNT_STRIP_TABLE)
+        
+        # Without a comma there is no separator to normalize
+        if ',' not in cleaned:
+            return float(cleaned)
+        
+        # Handle different number formats
+        if '.' in cleaned:
+            # Thousands and decimal separators present
+            # Assume last comma/dot is decimal separator
+            if cleaned.rfind(',') > cleaned.rfind('.'):
+                # Comma is decimal separator (European format)
+                # e.g., "1.120,60" -> "1120.60"
+                cleaned = cleaned.replace('.', '').replace(',', '.')
+            else:
+                # Dot is decimal separator (US format)
+                # e.g., "1,120.60" -> "1120.60"
+                cleaned = cleaned.replace(',', '')
+        else:
+            # Only comma present - could be thousands or decimal
+            comma_parts = cleaned.split(',')
+            if len(comma_parts) == 2 and len(comma_parts[1]) <= 2:
+                # Decimal separator (e.g., "1120,60")
+                cleaned = cleaned.replace(',', '.')
+            else:
+                # Thousands separator (e.g., "1,120")
+                cleaned = cleaned.replace(',', '')
+        
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+def _extract_one(text: str) -> Dict[str, List[Any]]:
+    """Run every extractor over one document in a worker process.
+    
+    Module level so it can be pickled by ProcessPoolExecutor; the patterns
+    it uses are compiled once per worker at import.
+    """
+    return TextExtractor().extract_all(text)
+
+
 @dataclass
 class TextRegion:
     """Represents a text region with positioning information."""
@@ -22,27 +243,50 @@ class TextExtractor:
     """Advanced text extraction with pattern matching and positioning."""
     
     def __init__(self):
-        self.date_patterns = [
-            r'\b(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})\b',
-            r'\b(\d{1,2}\s+(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\s+\d{2,4})\b',
-            r'\b(\d{1,2}\s+(januari|februari|maart|april|mei|juni|juli|augustus|september|oktober|november|december)\s+\d{2,4})\b',
-        ]
+        # Patterns are compiled once at module level and shared
+        self.amount_patterns = _AMOUNT_PATTERNS
+        self._amount_pattern_has_euro = ['€' in pattern.pattern for pattern in self.amount_patterns]
+        self.vat_patterns = _VAT_PATTERNS
+        self.invoice_patterns = _INVOICE_PATTERNS
+    
+    def extract_all(self, text: str) -> Dict[str, List[Any]]:
+        """Run every extractor over a document.
         
-        self.amount_patterns = [
-            r'€\s*(\d+[.,]\d{2})',
-            r'(\d+[.,]\d{2})\s*€',
-            r'\b(\d+[.,]\d{2})\b',
-        ]
+        Returns:
+            Dict with the results of extract_dates, extract_amounts,
+            extract_vat_numbers, extract_invoice_numbers and extract_addresses
+        """
+        return {
+            'dates': self.extract_dates(text),
+            'amounts': self.extract_amounts(text),
+            'vat_numbers': self.extract_vat_numbers(text),
+            'invoice_numbers': self.extract_invoice_numbers(text),
+            'addresses': self.extract_addresses(text),
+        }
+    
+    def extract_all_batch(self, texts: List[str],
+                          workers: Optional[int] = None) -> List[Dict[str, List[Any]]]:
+        """Run every extractor over many documents in parallel worker processes.
         
-        self.vat_patterns = [
-            r'(?:BTW|VAT)[-\s]*(?:nr|nummer|number)?[:\s]*([A-Z]{2}\d{9}B\d{2})',
-            r'([A-Z]{2}\d{9}B\d{2})',
-        ]
+        Documents are independent and the extraction is CPU-bound regex
+        work, so they are spread over a process pool. Results are returned
+        in input order.
         
-        self.invoice_patterns = [
-            r'(?:factuur|invoice)[-\s]*(?:nr|nummer|number)?[:\s#]*(\w+)',
-            r'(?:nr|no)[:\s.]*(\w+)',
-        ]
+        Args:
+            texts: Document texts
+            workers: Number of worker processes (default: CPU count)
+            
+        Returns:
+            One extract_all result per document
+        """
+        if not texts:
+            return []
+        
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(texts) // (workers * 4))
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_extract_one, texts, chunksize=chunksize))
     
     def extract_dates(self, text: str) -> List[Tuple[str, datetime, float]]:
         """Extract dates with confidence scores.
@@ -50,18 +294,39 @@ class TextExtractor:
         Returns:
             List of (original_text, parsed_date, confidence_score)
         """
-        dates = []
-        
-        for pattern in self.date_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                date_str = match.group(1)
-                parsed_date = self._parse_date(date_str)
-                if parsed_date:
-                    confidence = self._calculate_date_confidence(date_str, pattern)
-                    dates.append((date_str, parsed_date, confidence))
-        
-        return dates
+        if len(text) < _MIN_LEN['date']:
+            return []
+        
+        return [
+            (date_str, parsed_date, self._calculate_date_confidence(date_str, kind == 'numeric'))
+            for kind, matches in self._find_date_matches(text)
+            for date_str in map(_FIRST_GROUP, matches)
+            if (parsed_date := _parse_date(date_str))
+        ]
+    
+    def _find_date_matches(self, text: str) -> List[Tuple[str, List[re.Match]]]:
+        """Find the matches of each date pattern with a single scan.
+        
+        Each pattern is only tried at the start positions of its kind,
+        resuming after its previous match, so the result per pattern is
+        exactly what pattern.finditer(text) would return.
+        
+        Returns:
+            List of (start kind, matches) in _DATE_PATTERNS order
+        """
+        matches = [[] for _ in _DATE_PATTERNS]
+        resume = [0] * len(_DATE_PATTERNS)
+        
+        for start in _DATE_START_RE.finditer(text):
+            pos = start.start()
+            for i, pattern in enumerate(_DATE_PATTERNS):
+                if _DATE_PATTERN_STARTS[i] == start.lastgroup and pos >= resume[i]:
+                    match = pattern.match(text, pos)
+                    if match:
+                        matches[i].append(match)
+                        resume[i] = match.end()
+        
+        return list(zip(_DATE_PATTERN_STARTS, matches))
     
     def extract_amounts(self, text: str) -> List[Tuple[str, float, float]]:
         """Extract monetary amounts with confidence scores.
@@ -69,18 +334,15 @@ class TextExtractor:
         Returns:
             List of (original_text, amount, confidence_score)
         """
-        amounts = []
-        
-        for pattern in self.amount_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                amount_str = match.group(1)
-                amount = self._parse_amount(amount_str)
-                if amount is not None:
-                    confidence = self._calculate_amount_confidence(amount_str, pattern)
-                    amounts.append((amount_str, amount, confidence))
-        
-        return amounts
+        if len(text) < _MIN_LEN['amount']:
+            return []
+        
+        return [
+            (amount_str, amount, self._calculate_amount_confidence(amount_str, has_euro, amount))
+            for pattern, has_euro in zip(self.amount_patterns, self._amount_pattern_has_euro)
+            for amount_str in map(_FIRST_GROUP, pattern.finditer(text))
+            if (amount := _parse_amount(amount_str)) is not None
+        ]
     
     def extract_vat_numbers(self, text: str) -> List[Tuple[str, str, float]]:
         """Extract VAT numbers with confidence scores.
@@ -88,17 +350,15 @@ class TextExtractor:
         Returns:
             List of (original_text, vat_number, confidence_score)
         """
-        vat_numbers = []
-        
-        for pattern in self.vat_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                vat_str = match.group(1) if match.lastindex > 0 else match.group(0)
-                if self._validate_vat_number(vat_str):
-                    confidence = 0.9 if 'BTW' in match.group(0) or 'VAT' in match.group(0) else 0.7
-                    vat_numbers.append((match.group(0), vat_str, confidence))
-        
-        return vat_numbers
+        if len(text) < _MIN_LEN['vat']:
+            return []
+        
+        return [
+            (original, vat_str, 0.9 if 'BTW' in original or 'VAT' in original else 0.7)
+            for pattern in self.vat_patterns
+            for original, vat_str in map(_MATCH_AND_FIRST_GROUP, pattern.finditer(text))
+            if self._validate_vat_number(vat_str)
+        ]
     
     def extract_invoice_numbers(self, text: str) -> List[Tuple[str, str, float]]:
         """Extract invoice numbers with confidence scores.
@@ -106,16 +366,14 @@ class TextExtractor:
         Returns:
             List of (original_text, invoice_number, confidence_score)
         """
-        invoice_numbers = []
-        
-        for pattern in self.invoice_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                invoice_num = match.group(1)
-                confidence = self._calculate_invoice_confidence(invoice_num, pattern)
-                invoice_numbers.append((match.group(0), invoice_num, confidence))
+        if len(text) < _MIN_LEN['invoice']:
+            return []
         
-        return invoice_numbers
+        return [
+            (original, invoice_num, self._calculate_invoice_confidence(invoice_num, pattern))
+            for pattern in self.invoice_patterns
+            for original, invoice_num in map(_MATCH_AND_FIRST_GROUP, pattern.finditer(text))
+        ]
     
     def extract_addresses(self, text: str) -> List[Tuple[str, float]]:
         """Extract addresses with confidence scores.
@@ -125,151 +383,110 @@ class TextExtractor:
         """
         addresses = []
         
-        # Split text into lines and look for address patterns
-        lines = text.split('\n')
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if self._looks_like_address(line):
-                # Try to build a complete address
-                address_lines = [line]
-                
-                # Look for postal code in next few lines
-                for j in range(i + 1, min(i + 4, len(lines))):
-                    next_line = lines[j].strip()
-                    if self._looks_like_postal_code(next_line):
-                        address_lines.append(next_line)
-                        break
-                    elif len(next_line) > 0 and not self._looks_like_invoice_field(next_line):
-                        address_lines.append(next_line)
-                
-                if len(address_lines) > 1:
-                    full_address = '\n'.join(address_lines)
-                    confidence = self._calculate_address_confidence(full_address)
-                    addresses.append((full_address, confidence))
-        
-        return addresses
-    
-    def _parse_date(self, date_str: str) -> Optional[datetime]:
-        """Parse date string into datetime object."""
-        formats = [
-            '%d-%m-%Y', '%d/%m/%Y', '%d-%m-%y', '%d/%m/%y',
-            '%Y-%m-%d', '%Y/%m/%d',
-            '%d %B %Y', '%d %b %Y',
-        ]
-        
-        # Handle Dutch month names
-        dutch_months = {
-            'januari': 'january', 'februari': 'february', 'maart': 'march',
-            'april': 'april', 'mei': 'may', 'juni': 'june',
-            'juli': 'july', 'augustus': 'august', 'september': 'september',
-            'oktober': 'october', 'november': 'november', 'december': 'december'
-        }
-        
-        date_str = date_str.lower()
-        for dutch, english in dutch_months.items():
-            date_str = date_str.replace(dutch, english)
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-        
-        return None
-    
-    def _parse_amount(self, amount_str: str) -> Optional[float]:
-        """Parse amount string into float."""
-        try:
-            # Remove currency symbols and whitespace
-            cleaned = re.sub(r'[€$£¥\s]', '', amount_str.strip())
+        # An address spans at least two lines
+        if '\n' not in text:
+            return addresses
+        
+        # Split text into lines; the text is lowercased once up front.
+        # Lowercasing never adds or removes line breaks or surrounding
+        # whitespace, so both lists line up.
+        lowered_text = text.lower()
+        lines = [line.strip() for line in text.split('\n')]
+        lowered_lines = [line.strip() for line in lowered_text.split('\n')]
+        
+        # Classify lines with one scan of the text per check
+        postal_code_lines = self._matching_lines(_POSTAL_CODE_RE, text)
+        invoice_field_lines = self._matching_lines(_INVOICE_FIELD_RE, lowered_text)
+        
+        for i in sorted(self._matching_lines(_ADDRESS_START_RE, text)):
+            # Try to build a complete address
+            address_lines = [lines[i]]
+            lowered_address_lines = [lowered_lines[i]]
             
-            # Handle different number formats
-            if ',' in cleaned and '.' in cleaned:
-                # Thousands and decimal separators present
-                # Assume last comma/dot is decimal separator
-                if cleaned.rfind(',') > cleaned.rfind('.'):
-                    # Comma is decimal separator (European format)
-                    # e.g., "1.120,60" -> "1120.60"
-                    cleaned = cleaned.replace('.', '').replace(',', '.')
-                else:
-                    # Dot is decimal separator (US format)
-                    # e.g., "1,120.60" -> "1120.60"
-                    cleaned = cleaned.replace(',', '')
-            elif ',' in cleaned:
-                # Only comma present - could be thousands or decimal
-                comma_parts = cleaned.split(',')
-                if len(comma_parts) == 2 and len(comma_parts[1]) <= 2:
-                    # Decimal separator (e.g., "1120,60")
-                    cleaned = cleaned.replace(',', '.')
-                else:
-                    # Thousands separator (e.g., "1,120")
-                    cleaned = cleaned.replace(',', '')
+            # Look for postal code in next few lines
+            for j in range(i + 1, min(i + 4, len(lines))):
+                next_line = lines[j]
+                if j in postal_code_lines:
+                    address_lines.append(next_line)
+                    lowered_address_lines.append(lowered_lines[j])
+                    break
+                elif len(next_line) > 0 and j not in invoice_field_lines:
+                    address_lines.append(next_line)
+                    lowered_address_lines.append(lowered_lines[j])
             
-            return float(cleaned)
-        except ValueError:
-            return None
+            if len(address_lines) > 1:
+                full_address = '\n'.join(address_lines)
+                confidence = self._calculate_address_confidence(
+                    full_address, '\n'.join(lowered_address_lines))
+                addresses.append((full_address, confidence))
+        
+        return addresses
     
     def _validate_vat_number(self, vat_str: str) -> bool:
         """Validate VAT number format."""
         # Basic validation for Dutch VAT numbers
-        pattern = r'^[A-Z]{2}\d{9}B\d{2}$'
-        return bool(re.match(pattern, vat_str))
-    
-    def _looks_like_address(self, line: str) -> bool:
-        """Check if line looks like start of an address."""
-        # Look for street names, house numbers
-        if re.search(r'\d+[a-zA-Z]?\s', line):  # House number
-            return True
-        if re.search(r'(straat|laan|weg|plein|kade|gracht)', line, re.IGNORECASE):  # Dutch street types
-            return True
-        if re.search(r'(street|avenue|road|lane|drive)', line, re.IGNORECASE):  # English street types
-            return True
-        return False
+        return bool(_VAT_NUMBER_RE.match(vat_str))
     
-    def _looks_like_postal_code(self, line: str) -> bool:
-        """Check if line contains a postal code."""
-        # Dutch postal code pattern
-        if re.search(r'\d{4}\s*[A-Z]{2}', line):
-            return True
-        # International postal codes
-        if re.search(r'\d{4,5}', line):
-            return True
-        return False
-    
-    def _looks_like_invoice_field(self, line: str) -> bool:
-        """Check if line looks like an invoice field rather than address."""
-        field_indicators = [
-            'factuur', 'invoice', 'bedrag', 'amount', 'btw', 'vat',
-            'datum', 'date', 'totaal', 'total', 'nummer', 'number'
-        ]
-        return any(indicator in line.lower() for indicator in field_indicators)
+    def _matching_lines(self, pattern: re.Pattern, text: str) -> Set[int]:
+        """Return the numbers of the lines of text in which pattern matches.
+        
+        The pattern must not match across a line break. After a match the
+        search continues on the next line, and line numbers are counted
+        from the newlines skipped along the way.
+        """
+        numbers = set()
+        line_number = 0
+        pos = 0
+        
+        match = pattern.search(text)
+        while match:
+            line_number += text.count('\n', pos, match.start())
+            numbers.add(line_number)
+            
+            pos = text.find('\n', match.end() - 1)
+            if pos == -1:
+                break
+            match = pattern.search(text, pos + 1)
+        
+        return numbers
     
-    def _calculate_date_confidence(self, date_str: str, pattern: str) -> float:
-        """Calculate confidence score for date extraction."""
+    def _calculate_date_confidence(self, date_str: str, numeric: bool) -> float:
+        """Calculate confidence score for date extraction.
+        
+        Args:
+            date_str: Matched date text
+            numeric: Whether it is a numeric date rather than one with a
+                month name; only the rules that can apply to that kind of
+                date are checked
+        """
         confidence = 0.5
         
         # Higher confidence for more specific patterns
-        if re.search(r'\d{1,2}[-/]\d{1,2}[-/]\d{4}', date_str):
+        if numeric and _FULL_YEAR_DATE_RE.search(date_str):
             confidence += 0.3
         
         # Lower confidence for 2-digit years
-        if re.search(r'\d{2}$', date_str):
+        if _TWO_DIGIT_END_RE.search(date_str):
             confidence -= 0.1
         
         # Higher confidence for month names
-        if any(month in date_str.lower() for month in ['jan', 'feb', 'mar', 'apr', 'may', 'jun',
-                                                       'jul', 'aug', 'sep', 'oct', 'nov', 'dec']):
+        if not numeric and _MONTH_INDICATOR_RE.search(date_str.lower()):
             confidence += 0.2
         
         return min(confidence, 1.0)
     
-    def _calculate_amount_confidence(self, amount_str: str, pattern: str) -> float:
-        """Calculate confidence score for amount extraction."""
+    def _calculate_amount_confidence(self, amount_str: str, has_euro: bool, amount: float) -> float:
+        """Calculate confidence score for amount extraction.
+        
+        Args:
+            amount_str: Matched amount text
+            has_euro: Whether the matching pattern requires a euro sign
+            amount: Amount as parsed by _parse_amount
+        """
         confidence = 0.5
         
         # Higher confidence for currency symbols
-        if '€' in pattern:
+        if has_euro:
             confidence += 0.3
         
         # Higher confidence for decimal amounts
@@ -277,25 +494,22 @@ class TextExtractor:
             confidence += 0.2
         
         # Lower confidence for very small or very large amounts
-        try:
-            amount = float(amount_str.replace(',', '.'))
-            if amount < 1 or amount > 100000:
-                confidence -= 0.2
-        except ValueError:
-            pass
+        if amount < 1 or amount > 100000:
+            confidence -= 0.2
         
         return min(confidence, 1.0)
     
-    def _calculate_invoice_confidence(self, invoice_num: str, pattern: str) -> float:
+    def _calculate_invoice_confidence(self, invoice_num: str, pattern: re.Pattern) -> float:
         """Calculate confidence score for invoice number extraction."""
         confidence = 0.5
         
         # Higher confidence for explicit invoice patterns
-        if 'factuur' in pattern.lower() or 'invoice' in pattern.lower():
+        source = pattern.pattern.lower()
+        if 'factuur' in source or 'invoice' in source:
             confidence += 0.3
         
         # Higher confidence for alphanumeric patterns
-        if re.search(r'[A-Z]', invoice_num) and re.search(r'\d', invoice_num):
+        if _UPPERCASE_RE.search(invoice_num) and _DIGIT_RE.search(invoice_num):
             confidence += 0.2
         
         # Lower confidence for very short or very long numbers
@@ -304,8 +518,13 @@ class TextExtractor:
         
         return min(confidence, 1.0)
     
-    def _calculate_address_confidence(self, address: str) -> float:
-        """Calculate confidence score for address extraction."""
+    def _calculate_address_confidence(self, address: str, lowered_address: str) -> float:
+        """Calculate confidence score for address extraction.
+        
+        Args:
+            address: Address lines joined by newlines
+            lowered_address: The same address, lowercased
+        """
         confidence = 0.5
         
         # Higher confidence for multiple lines
@@ -313,12 +532,11 @@ class TextExtractor:
             confidence += 0.2
         
         # Higher confidence for postal codes
-        if re.search(r'\d{4}\s*[A-Z]{2}', address):
+        if _DUTCH_POSTAL_CODE_RE.search(address):
             confidence += 0.3
         
         # Higher confidence for street indicators
-        street_indicators = ['straat', 'laan', 'weg', 'plein', 'street', 'avenue', 'road']
-        if any(indicator in address.lower() for indicator in street_indicators):
+        if _STREET_INDICATOR_RE.search(lowered_address):
             confidence += 0.2
         
         return min(confidence, 1.0)
\ No newline at end of file
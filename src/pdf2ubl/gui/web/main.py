@@ -3,7 +3,8 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response
 from pathlib import Path
 import logging
 from typing import List, Optional
@@ -35,29 +36,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses for clients that accept gzip; small JSON bodies are
+# left alone since compressing them saves too little to be worth it
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
 # Include API routers
 app.include_router(templates_router, prefix="/api/templates", tags=["templates"])
 app.include_router(conversion_router, prefix="/api/conversion", tags=["conversion"])
 app.include_router(ml_router, prefix="/api/ml", tags=["machine-learning"])
 
-# Mount static files for frontend
-static_path = Path(__file__).parent.parent / "frontend" / "build"
+class CachedStatic(StaticFiles):
+    """Static files that browsers may cache for a year without revalidating.
+    
+    Only for the build's static/ directory, whose file names carry a
+    content hash, so a changed file is always served under a new name.
+    """
+    
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+# Mount static files for frontend. Paths and whether the frontend is built
+# are resolved once at import, like the mounts; rebuilding the frontend
+# while the server runs needs a restart to be picked up.
+static_path = (Path(__file__).parent.parent / "frontend" / "build").resolve()
 if static_path.exists():
     # Mount static files from the build directory
-    app.mount("/static", StaticFiles(directory=str(static_path / "static")), name="static")
-    # Also serve any other static assets from the build directory
+    app.mount("/static", CachedStatic(directory=str(static_path / "static")), name="static")
+    # Also serve any other static assets from the build directory; these keep
+    # their names across builds, so they are revalidated as usual
     app.mount("/assets", StaticFiles(directory=str(static_path)), name="assets")
 
-@app.get("/", response_class=HTMLResponse)
-async def read_root():
-    """Serve the main web interface."""
-    frontend_path = Path(__file__).parent.parent / "frontend" / "build" / "index.html"
-    
-    if frontend_path.exists():
-        return HTMLResponse(content=frontend_path.read_text(), status_code=200)
-    else:
-        # Return a simple development page if frontend is not built
-        return HTMLResponse(content="""
+index_path = static_path / "index.html"
+has_frontend = index_path.is_file()
+
+# Development page served when the frontend is not built, encoded once
+_DEV_HTML = """
         <!DOCTYPE html>
         <html>
         <head>
@@ -108,31 +123,46 @@ async def read_root():
             </div>
         </body>
         </html>
-        """, status_code=200)
+        """.encode("utf-8")
+
+@app.get("/", response_class=HTMLResponse)
+async def read_root():
+    """Serve the main web interface."""
+    if has_frontend:
+        # Streamed from disk as-is, with ETag and Last-Modified headers
+        return FileResponse(index_path, media_type="text/html")
+    else:
+        # Return a simple development page if frontend is not built
+        return HTMLResponse(content=_DEV_HTML, status_code=200)
+
+# Static JSON bodies, serialized once; health checks are polled frequently
+_HEALTH_JSON = JSONResponse({"status": "healthy", "service": "PDF2UBL GUI"}).body
+_INFO_JSON = JSONResponse({
+    "name": "PDF2UBL GUI",
+    "version": __version__,
+    "description": "Web interface for PDF2UBL conversion",
+    "endpoints": {
+        "templates": "/api/templates",
+        "conversion": "/api/conversion",
+        "ml": "/api/ml"
+    }
+}).body
+_VERSION_JSON = JSONResponse({"version": __version__}).body
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "PDF2UBL GUI"}
+    return Response(content=_HEALTH_JSON, media_type="application/json")
 
 @app.get("/api/info")
 async def get_info():
     """Get application information."""
-    return {
-        "name": "PDF2UBL GUI",
-        "version": __version__,
-        "description": "Web interface for PDF2UBL conversion",
-        "endpoints": {
-            "templates": "/api/templates",
-            "conversion": "/api/conversion", 
-            "ml": "/api/ml"
-        }
-    }
+    return Response(content=_INFO_JSON, media_type="application/json")
 
 @app.get("/api/version")
 async def get_version():
     """Get application version."""
-    return {"version": __version__}
+    return Response(content=_VERSION_JSON, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
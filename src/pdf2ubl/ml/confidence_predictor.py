@@ -1,15 +1,111 @@
 """ML-powered confidence predictor for PDF2UBL."""
 
 import re
+import math
 import logging
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from dataclasses import dataclass
-import statistics
 
 from ..templates.template_models import Template, FieldPattern, ExtractionRule
 
 logger = logging.getLogger(__name__)
 
+# Extracted value formats checked by _adjust_confidence_by_match_quality
+_AMOUNT_FORMAT_RE = re.compile(r'^\d+[.,]\d{2}$')
+_DATE_FORMAT_RE = re.compile(r'^\d{1,2}[-/]\d{1,2}[-/]\d{2,4}$')
+_VAT_FORMAT_RE = re.compile(r'^[A-Z]{2}\d{9}B\d{2}$')
+_DIGIT_RE = re.compile(r'\d')
+_YEAR_LIKE_RE = re.compile(r'\d{2,4}')
+
+# Constructs looked for in the source of a template pattern
+_WORD_BOUNDARY_RE = re.compile(r'\\b')
+_CHAR_SET_RE = re.compile(r'\[.*\]')
+_QUANTIFIER_RE = re.compile(r'\{.*\}')
+
+# More specific patterns get higher confidence
+_SPECIFICITY_INDICATORS = [
+    (_WORD_BOUNDARY_RE, 0.1),  # Word boundaries
+    (re.compile(r'\[\^\s\]'), 0.1),  # Character classes
+    (_QUANTIFIER_RE, 0.1),  # Quantifiers
+    (re.compile(r'\(\?\:'), 0.05),  # Non-capturing groups
+    (re.compile(r'[\[\(].*[\]\)]'), 0.05),  # Groups/character sets
+]
+
+# Expected context keywords for different field types (lowercase, and
+# without newlines, see _score_match)
+_CONTEXT_KEYWORDS = {
+    "amount": ("totaal", "total", "bedrag", "amount", "€", "eur", "betalen", "pay"),
+    "date": ("datum", "date", "factuurdatum", "invoice date"),
+    "invoice_number": ("factuur", "invoice", "nummer", "number", "nr"),
+    "vat_number": ("btw", "vat", "belasting", "tax"),
+    "supplier_name": ("leverancier", "supplier", "van", "from", "factuur van")
+}
+
+# Negative context keywords (indicators that this might be the wrong field)
+_NEGATIVE_CONTEXT_KEYWORDS = {
+    "amount": ("klantnummer", "customer", "telefoon", "phone", "email"),
+    "date": ("bedrag", "amount", "€", "eur"),
+    "invoice_number": ("datum", "date", "€", "eur", "btw"),
+    "vat_number": ("datum", "date", "€", "eur", "factuur"),
+    "supplier_name": ("€", "eur", "datum", "date", "btw")
+}
+
+# Document structure and OCR quality indicators
+_INVOICE_TERM_RE = re.compile(r'factuur|invoice', re.IGNORECASE)
+_AMOUNT_LIKE_RE = re.compile(r'€|\d+[.,]\d{2}')
+_DATE_LIKE_RE = re.compile(r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}')
+_OCR_NOISE_RE = re.compile(r'[^\w\s€\.,\-/()]+')
+
+@lru_cache(maxsize=1024)
+def _compile_pattern(pattern: str, flags: int) -> re.Pattern:
+    """Compile a template field regex once per pattern and flags."""
+    return re.compile(pattern, flags)
+
+@lru_cache(maxsize=1024)
+def _pattern_specificity(pattern_text: str, has_validation: bool) -> float:
+    """Score a template pattern's specificity (memoized, it only depends on the pattern)."""
+    score = 0.5  # Base score
+    
+    # Bonus for specific constructs
+    if _WORD_BOUNDARY_RE.search(pattern_text):
+        score += 0.1
+    if _CHAR_SET_RE.search(pattern_text):
+        score += 0.1
+    if _QUANTIFIER_RE.search(pattern_text):
+        score += 0.1
+    if len(pattern_text) > 20:
+        score += 0.1
+    if has_validation:
+        score += 0.2
+    
+    return min(score, 1.0)
+
+@lru_cache(maxsize=1024)
+def _specificity_adjustments(pattern_text: str) -> Tuple[float, ...]:
+    """Confidence adjustments for a matched pattern's source, in the order applied.
+    
+    Kept as separate steps rather than a sum so that adding them to a
+    confidence rounds exactly as adding them one by one does.
+    """
+    adjustments = []
+    
+    # More specific patterns get higher confidence
+    for indicator, bonus in _SPECIFICITY_INDICATORS:
+        if indicator.search(pattern_text):
+            adjustments.append(bonus)
+    
+    # Very short patterns are less reliable
+    if len(pattern_text) < 10:
+        adjustments.append(-0.1)
+    
+    # Very long patterns might be over-fitted
+    if len(pattern_text) > 100:
+        adjustments.append(-0.05)
+    
+    return tuple(adjustments)
+
 @dataclass
 class ConfidencePredictionResult:
     """Result of confidence prediction."""
@@ -18,6 +114,32 @@ class ConfidencePredictionResult:
     quality_score: float
     recommendations: List[str]
 
+class _FieldConfidences(NamedTuple):
+    """Field confidences for a template, and how many of its patterns matched."""
+    confidences: Dict[str, float]
+    matched_patterns: int
+    total_patterns: int
+
+class _TemplateView(NamedTuple):
+    """What the scoring steps read from a template's extraction rules."""
+    field_names: List[str]
+    required_fields: List[str]
+    patterns: List[FieldPattern]
+
+def _build_template_view(template: Template) -> _TemplateView:
+    """Collect field names, required fields and patterns in one pass over the rules."""
+    field_names = []
+    required_fields = []
+    patterns = []
+    
+    for rule in template.extraction_rules:
+        field_names.append(rule.field_name)
+        if rule.required:
+            required_fields.append(rule.field_name)
+        patterns.extend(rule.patterns)
+    
+    return _TemplateView(field_names, required_fields, patterns)
+
 class ConfidencePredictor:
     """ML-powered confidence predictor for extraction quality."""
     
@@ -51,17 +173,49 @@ class ConfidencePredictor:
         
         self.logger.info(f"Predicting confidence for template: {template.name}")
         
+        return self._predict(template, _build_template_view(template), text_content)
+    
+    def predict_confidence_batch(self, template: Template,
+                                 texts: List[str]) -> List[ConfidencePredictionResult]:
+        """Predict extraction confidence for several texts against one template.
+        
+        Gives the same results as calling predict_confidence() per text, but
+        the template is prepared once for the whole batch. Prefer this when
+        scoring more than a handful of documents against the same template.
+        
+        Args:
+            template: Template to score the texts against
+            texts: Document texts
+            
+        Returns:
+            One result per text, in the same order
+        """
+        
+        self.logger.info(f"Predicting confidence for template: {template.name} ({len(texts)} documents)")
+        
+        view = _build_template_view(template)
+        return [self._predict(template, view, text_content) for text_content in texts]
+    
+    def _predict(self, template: Template, view: _TemplateView, text_content: str) -> ConfidencePredictionResult:
+        """Predict extraction confidence for one text, given the prepared template view."""
+        
+        # Whether the text mentions an invoice, for the text quality score
+        # and the recommendations
+        is_invoice = bool(_INVOICE_TERM_RE.search(text_content))
+        
         # Calculate field-level confidences
-        field_confidences = self._calculate_field_confidences(template, text_content)
+        field_results = self._calculate_field_confidences(template, text_content)
+        field_confidences = field_results.confidences
         
         # Calculate overall confidence
-        overall_confidence = self._calculate_overall_confidence(field_confidences, template)
+        overall_confidence = self._calculate_overall_confidence(field_confidences, view)
         
         # Calculate quality score
-        quality_score = self._calculate_quality_score(template, text_content, field_confidences)
+        quality_score = self._calculate_quality_score(template, view, text_content, field_results, is_invoice)
         
         # Generate recommendations
-        recommendations = self._generate_recommendations(template, text_content, field_confidences, quality_score)
+        recommendations = self._generate_recommendations(template, view, text_content, field_confidences,
+                                                        quality_score, is_invoice)
         
         return ConfidencePredictionResult(
             overall_confidence=overall_confidence,
@@ -70,44 +224,66 @@ class ConfidencePredictor:
             recommendations=recommendations
         )
     
-    def _calculate_field_confidences(self, template: Template, text_content: str) -> Dict[str, float]:
-        """Calculate confidence scores for each field in the template."""
+    def _calculate_field_confidences(self, template: Template, text_content: str) -> _FieldConfidences:
+        """Calculate confidence scores for each field in the template.
+        
+        Also counts the template's patterns that match, for the pattern
+        coverage score, so the patterns are only searched once.
+        """
         
         field_confidences = {}
+        matched_patterns = 0
+        total_patterns = 0
         
         # Test each extraction rule
         for rule in template.extraction_rules:
-            confidence = self._test_extraction_rule(rule, text_content)
+            confidence, matched = self._test_extraction_rule(rule, text_content)
             field_confidences[rule.field_name] = confidence
+            matched_patterns += matched
+            total_patterns += len(rule.patterns)
         
-        return field_confidences
+        return _FieldConfidences(field_confidences, matched_patterns, total_patterns)
     
-    def _test_extraction_rule(self, rule: ExtractionRule, text_content: str) -> float:
-        """Test an extraction rule against text content and return confidence."""
+    def _test_extraction_rule(self, rule: ExtractionRule, text_content: str) -> Tuple[float, int]:
+        """Test an extraction rule against text content.
+        
+        Returns:
+            Tuple of (confidence, number of the rule's patterns that matched)
+        """
         
         if not rule.patterns:
-            return 0.0
+            return 0.0, 0
         
         pattern_scores = []
+        matched = 0
         
         for pattern in rule.patterns:
             score = self._test_pattern(pattern, text_content)
-            pattern_scores.append(score)
+            if score is None:
+                pattern_scores.append(0.0)
+            else:
+                pattern_scores.append(score)
+                matched += 1
         
         if not pattern_scores:
-            return 0.0
+            return 0.0, matched
         
         # Use the highest scoring pattern, but consider pattern diversity
         max_score = max(pattern_scores)
-        avg_score = statistics.mean(pattern_scores)
+        avg_score = sum(pattern_scores) / len(pattern_scores)
         
         # Weighted combination favoring the best pattern but rewarding consistency
         final_score = (max_score * 0.7) + (avg_score * 0.3)
         
-        return min(final_score, 1.0)
+        return min(final_score, 1.0), matched
     
-    def _test_pattern(self, pattern: FieldPattern, text_content: str) -> float:
-        """Test a single pattern against text content."""
+    def _test_pattern(self, pattern: FieldPattern, text_content: str) -> Optional[float]:
+        """Test a single pattern against text content.
+        
+        Returns:
+            Confidence for the pattern's match, None if the pattern does not
+            match or is not a valid regex
+        """
         
         try:
             # Test if pattern matches
@@ -117,149 +293,104 @@ class ConfidencePredictor:
             if pattern.multiline:
                 flags |= re.MULTILINE
             
-            match = re.search(pattern.pattern, text_content, flags)
+            compiled = _compile_pattern(pattern.pattern, flags)
+            match = compiled.search(text_content)
             
             if not match:
-                return 0.0
-            
-            # Base confidence from pattern
-            confidence = pattern.confidence_threshold
-            
-            # Adjust based on match quality
-            confidence = self._adjust_confidence_by_match_quality(pattern, match, text_content)
-            
-            # Adjust based on pattern specificity
-            confidence = self._adjust_confidence_by_specificity(pattern, confidence)
-            
-            # Adjust based on context
-            confidence = self._adjust_confidence_by_context(pattern, match, text_content)
+                return None
             
-            return min(confidence, 1.0)
+            return min(self._score_match(pattern, compiled, match, text_content), 1.0)
         
         except re.error as e:
             self.logger.warning(f"Invalid regex pattern: {pattern.pattern} - {e}")
-            return 0.0
+            return None
     
-    def _adjust_confidence_by_match_quality(self, pattern: FieldPattern, match: re.Match, text_content: str) -> float:
-        """Adjust confidence based on match quality."""
-        
+    def _score_match(self, pattern: FieldPattern, compiled: re.Pattern,
+                     match: re.Match, text_content: str) -> float:
+        """Score a pattern's match in the text.
+        
+        Starting from the pattern's base confidence, adjusts for the quality
+        of the match, the specificity of the pattern and the context around
+        the match, in that order.
+        
+        Args:
+            pattern: Template pattern that matched
+            compiled: The pattern as searched, with its own flags
+            match: First match of compiled in text_content
+            text_content: Document text
+        """
+        
+        # Base confidence from pattern
         confidence = pattern.confidence_threshold
-        extracted_value = match.group(1) if match.groups() else match.group(0)
+        field_type = pattern.field_type.value
+        # The first group's value, or the whole match when the pattern has no
+        # groups or its first group did not take part in the match
+        group1 = match.group(1) if match.re.groups else None
+        extracted_value = group1 if group1 is not None else match.group(0)
+        start, end = match.span()
         
-        # Check value quality based on field type
-        if pattern.field_type.value == "amount":
+        # Adjust based on match quality, by field type
+        if field_type == "amount":
             # Good amount format increases confidence
-            if re.match(r'^\d+[.,]\d{2}$', extracted_value):
+            if _AMOUNT_FORMAT_RE.match(extracted_value):
                 confidence += 0.2
-            elif re.search(r'\d', extracted_value):
+            elif _DIGIT_RE.search(extracted_value):
                 confidence += 0.1
         
-        elif pattern.field_type.value == "date":
+        elif field_type == "date":
             # Good date format increases confidence
-            if re.match(r'^\d{1,2}[-/]\d{1,2}[-/]\d{2,4}$', extracted_value):
+            if _DATE_FORMAT_RE.match(extracted_value):
                 confidence += 0.2
-            elif re.search(r'\d{2,4}', extracted_value):
+            elif _YEAR_LIKE_RE.search(extracted_value):
                 confidence += 0.1
         
-        elif pattern.field_type.value == "vat_number":
+        elif field_type == "vat_number":
             # Proper VAT format is crucial
-            if re.match(r'^[A-Z]{2}\d{9}B\d{2}$', extracted_value):
+            if _VAT_FORMAT_RE.match(extracted_value):
                 confidence += 0.3
             else:
                 confidence -= 0.2
         
-        elif pattern.field_type.value == "text":
+        elif field_type == "text":
             # Reasonable text length and content
             if 3 <= len(extracted_value) <= 100:
                 confidence += 0.1
             if not extracted_value.isdigit():  # Not just numbers
                 confidence += 0.1
         
-        # Check for multiple matches (could indicate ambiguity)
-        all_matches = re.findall(pattern.pattern, text_content, re.IGNORECASE | re.MULTILINE)
-        if len(all_matches) > 1:
+        # Check for multiple matches (could indicate ambiguity). Only a second
+        # match matters, so the search resumes after the first one; after an
+        # empty match finditer is used to step past it the same way findall does.
+        if end > start:
+            has_second_match = compiled.search(text_content, end) is not None
+        else:
+            matches = compiled.finditer(text_content)
+            next(matches)
+            has_second_match = next(matches, None) is not None
+        
+        if has_second_match:
             confidence -= 0.1  # Slightly reduce confidence for ambiguous patterns
         
-        return confidence
-    
-    def _adjust_confidence_by_specificity(self, pattern: FieldPattern, confidence: float) -> float:
-        """Adjust confidence based on pattern specificity."""
-        
-        pattern_text = pattern.pattern
-        
-        # More specific patterns get higher confidence
-        specificity_indicators = [
-            (r'\\b', 0.1),  # Word boundaries
-            (r'\[\^\s\]', 0.1),  # Character classes
-            (r'\{.*\}', 0.1),  # Quantifiers
-            (r'\(\?\:', 0.05),  # Non-capturing groups
-            (r'[\[\(].*[\]\)]', 0.05),  # Groups/character sets
-        ]
-        
-        for indicator, bonus in specificity_indicators:
-            if re.search(indicator, pattern_text):
-                confidence += bonus
-        
-        # Very short patterns are less reliable
-        if len(pattern_text) < 10:
-            confidence -= 0.1
-        
-        # Very long patterns might be over-fitted
-        if len(pattern_text) > 100:
-            confidence -= 0.05
-        
-        return confidence
-    
-    def _adjust_confidence_by_context(self, pattern: FieldPattern, match: re.Match, text_content: str) -> float:
-        """Adjust confidence based on context around the match."""
-        
-        confidence = pattern.confidence_threshold
+        # Adjust based on pattern specificity
+        for adjustment in _specificity_adjustments(pattern.pattern):
+            confidence += adjustment
         
-        # Get context around the match
-        start, end = match.span()
-        before_context = text_content[max(0, start-100):start].lower()
-        after_context = text_content[end:end+100].lower()
-        
-        # Define expected context keywords for different field types
-        context_keywords = {
-            "amount": ["totaal", "total", "bedrag", "amount", "€", "eur", "betalen", "pay"],
-            "date": ["datum", "date", "factuurdatum", "invoice date"],
-            "invoice_number": ["factuur", "invoice", "nummer", "number", "nr"],
-            "vat_number": ["btw", "vat", "belasting", "tax"],
-            "supplier_name": ["leverancier", "supplier", "van", "from", "factuur van"]
-        }
+        # Adjust based on context around the match
+        # Search both sides at once, lowercased together; no keyword contains
+        # a newline, so none can be found across the join
+        context = (text_content[max(0, start-100):start] + '\n' + text_content[end:end+100]).lower()
         
-        field_type = pattern.field_type.value
-        if field_type in context_keywords:
-            keywords = context_keywords[field_type]
-            
-            # Check for positive context
-            positive_context = any(keyword in before_context or keyword in after_context 
-                                 for keyword in keywords)
-            
-            if positive_context:
-                confidence += 0.15
+        # Check for positive context
+        if any(keyword in context for keyword in _CONTEXT_KEYWORDS.get(field_type, ())):
+            confidence += 0.15
         
         # Check for negative context (indicators that this might be wrong field)
-        negative_keywords = {
-            "amount": ["klantnummer", "customer", "telefoon", "phone", "email"],
-            "date": ["bedrag", "amount", "€", "eur"],
-            "invoice_number": ["datum", "date", "€", "eur", "btw"],
-            "vat_number": ["datum", "date", "€", "eur", "factuur"],
-            "supplier_name": ["€", "eur", "datum", "date", "btw"]
-        }
-        
-        if field_type in negative_keywords:
-            neg_keywords = negative_keywords[field_type]
-            negative_context = any(keyword in before_context or keyword in after_context 
-                                 for keyword in neg_keywords)
-            
-            if negative_context:
-                confidence -= 0.1
+        if any(keyword in context for keyword in _NEGATIVE_CONTEXT_KEYWORDS.get(field_type, ())):
+            confidence -= 0.1
         
         return confidence
     
-    def _calculate_overall_confidence(self, field_confidences: Dict[str, float], template: Template) -> float:
+    def _calculate_overall_confidence(self, field_confidences: Dict[str, float], view: _TemplateView) -> float:
         """Calculate overall confidence score."""
         
         if not field_confidences:
@@ -276,13 +407,11 @@ class ConfidencePredictor:
         
         # Add bonus for required fields
         required_fields_found = 0
-        required_fields_total = 0
+        required_fields_total = len(view.required_fields)
         
-        for rule in template.extraction_rules:
-            if rule.required:
-                required_fields_total += 1
-                if rule.field_name in field_confidences and field_confidences[rule.field_name] > 0.5:
-                    required_fields_found += 1
+        for field_name in view.required_fields:
+            if field_name in field_confidences and field_confidences[field_name] > 0.5:
+                required_fields_found += 1
         
         required_field_bonus = 0.0
         if required_fields_total > 0:
@@ -296,22 +425,23 @@ class ConfidencePredictor:
         
         return overall_confidence
     
-    def _calculate_quality_score(self, template: Template, text_content: str, field_confidences: Dict[str, float]) -> float:
+    def _calculate_quality_score(self, template: Template, view: _TemplateView, text_content: str,
+                                 field_results: _FieldConfidences, is_invoice: bool) -> float:
         """Calculate overall quality score for the extraction."""
         
         scores = {}
         
         # Pattern specificity score
-        scores["pattern_specificity"] = self._score_pattern_specificity(template)
+        scores["pattern_specificity"] = self._score_pattern_specificity(view)
         
         # Pattern coverage score
-        scores["pattern_coverage"] = self._score_pattern_coverage(template, text_content)
+        scores["pattern_coverage"] = self._score_pattern_coverage(field_results)
         
         # Field completeness score
-        scores["field_completeness"] = self._score_field_completeness(template, field_confidences)
+        scores["field_completeness"] = self._score_field_completeness(view, field_results.confidences)
         
         # Text quality score
-        scores["text_quality"] = self._score_text_quality(text_content)
+        scores["text_quality"] = self._score_text_quality(text_content, is_invoice)
         
         # Template maturity score
         scores["template_maturity"] = self._score_template_maturity(template)
@@ -322,66 +452,35 @@ class ConfidencePredictor:
         
         return min(quality_score, 1.0)
     
-    def _score_pattern_specificity(self, template: Template) -> float:
+    def _score_pattern_specificity(self, view: _TemplateView) -> float:
         """Score pattern specificity."""
         
-        if not template.extraction_rules:
-            return 0.0
-        
-        specificity_scores = []
+        # Score based on pattern complexity
+        specificity_scores = [_pattern_specificity(pattern.pattern, bool(pattern.validation_pattern))
+                              for pattern in view.patterns]
         
-        for rule in template.extraction_rules:
-            for pattern in rule.patterns:
-                # Score based on pattern complexity
-                pattern_text = pattern.pattern
-                
-                score = 0.5  # Base score
-                
-                # Bonus for specific constructs
-                if re.search(r'\\b', pattern_text):
-                    score += 0.1
-                if re.search(r'\[.*\]', pattern_text):
-                    score += 0.1
-                if re.search(r'\{.*\}', pattern_text):
-                    score += 0.1
-                if len(pattern_text) > 20:
-                    score += 0.1
-                if pattern.validation_pattern:
-                    score += 0.2
-                
-                specificity_scores.append(min(score, 1.0))
-        
-        return statistics.mean(specificity_scores) if specificity_scores else 0.0
+        return sum(specificity_scores) / len(specificity_scores) if specificity_scores else 0.0
     
-    def _score_pattern_coverage(self, template: Template, text_content: str) -> float:
-        """Score how well patterns cover the text content."""
+    def _score_pattern_coverage(self, field_results: _FieldConfidences) -> float:
+        """Score how well patterns cover the text content.
         
-        if not template.extraction_rules:
-            return 0.0
+        Uses the pattern matches found by _calculate_field_confidences.
+        """
         
-        successful_patterns = 0
-        total_patterns = 0
+        if field_results.total_patterns == 0:
+            return 0.0
         
-        for rule in template.extraction_rules:
-            for pattern in rule.patterns:
-                total_patterns += 1
-                try:
-                    if re.search(pattern.pattern, text_content, re.IGNORECASE | re.MULTILINE):
-                        successful_patterns += 1
-                except re.error:
-                    pass
-        
-        return successful_patterns / total_patterns if total_patterns > 0 else 0.0
+        return field_results.matched_patterns / field_results.total_patterns
     
-    def _score_field_completeness(self, template: Template, field_confidences: Dict[str, float]) -> float:
+    def _score_field_completeness(self, view: _TemplateView, field_confidences: Dict[str, float]) -> float:
         """Score field completeness."""
         
-        if not template.extraction_rules:
+        if not view.field_names:
             return 0.0
         
         # Required fields
-        required_fields = [rule.field_name for rule in template.extraction_rules if rule.required]
-        total_fields = [rule.field_name for rule in template.extraction_rules]
+        required_fields = view.required_fields
+        total_fields = view.field_names
         
         # Score required fields more heavily
         required_score = 0.0
@@ -400,8 +499,13 @@ class ConfidencePredictor:
         # Weighted combination
         return (required_score * 0.7) + (total_score * 0.3)
     
-    def _score_text_quality(self, text_content: str) -> float:
-        """Score text content quality."""
+    def _score_text_quality(self, text_content: str, is_invoice: bool) -> float:
+        """Score text content quality.
+        
+        Args:
+            text_content: Document text
+            is_invoice: Whether the text mentions an invoice (factuur/invoice)
+        """
         
         score = 0.5  # Base score
         
@@ -413,16 +517,18 @@ class ConfidencePredictor:
             score += 0.1
         
         # Structure indicators
-        if re.search(r'factuur|invoice', text_content, re.IGNORECASE):
+        if is_invoice:
             score += 0.1
-        if re.search(r'€|\d+[.,]\d{2}', text_content):
+        if _AMOUNT_LIKE_RE.search(text_content):
             score += 0.1
-        if re.search(r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}', text_content):
+        if _DATE_LIKE_RE.search(text_content):
             score += 0.1
         
-        # OCR quality indicators
-        ocr_errors = len(re.findall(r'[^\w\s€\.,\-/()]+', text_content))
-        if ocr_errors < text_length * 0.01:  # Less than 1% unusual characters
+        # OCR quality indicators. Only whether the limit is reached matters,
+        # so runs of unusual characters are counted up to the limit.
+        max_ocr_errors = math.ceil(text_length * 0.01)
+        ocr_errors = sum(1 for _ in islice(_OCR_NOISE_RE.finditer(text_content), max_ocr_errors))
+        if ocr_errors < max_ocr_errors:  # Less than 1% unusual characters
             score += 0.1
         
         return min(score, 1.0)
@@ -450,8 +556,9 @@ class ConfidencePredictor:
         
         return min(score, 1.0)
     
-    def _generate_recommendations(self, template: Template, text_content: str, 
-                                field_confidences: Dict[str, float], quality_score: float) -> List[str]:
+    def _generate_recommendations(self, template: Template, view: _TemplateView, text_content: str,
+                                field_confidences: Dict[str, float], quality_score: float,
+                                is_invoice: bool) -> List[str]:
         """Generate recommendations for improving extraction confidence."""
         
         recommendations = []
@@ -470,16 +577,15 @@ class ConfidencePredictor:
                                  "Consider reviewing and improving patterns for these fields.")
         
         # Required field recommendations
-        required_fields = [rule.field_name for rule in template.extraction_rules if rule.required]
-        missing_required = [field for field in required_fields 
-                          if field not in field_confidences or field_confidences[field] < 0.5]
+        missing_required = [field for field in view.required_fields
+                            if field_confidences.get(field, 0.0) < 0.5]
         
         if missing_required:
             recommendations.append(f"Required fields with low confidence: {', '.join(missing_required)}. "
                                  "These fields are critical for successful extraction.")
         
         # Pattern-specific recommendations
-        if not any(re.search(r'factuur|invoice', text_content, re.IGNORECASE)):
+        if not is_invoice:
             recommendations.append("Document doesn't appear to be an invoice. Verify document type.")
         
         # Template improvement recommendations
@@ -2,6 +2,7 @@
 
 import re
 import logging
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from collections import Counter
@@ -9,6 +10,30 @@ import string
 
 logger = logging.getLogger(__name__)
 
+# Flags for searching pattern templates and suggested patterns in samples
+_SEARCH_FLAGS = re.IGNORECASE | re.MULTILINE
+
+# Most potential values analyzed per call
+_MAX_POTENTIAL_VALUES = 20
+
+# Value checks used by _filter_values_by_quality
+_DIGIT_RE = re.compile(r'\d')
+_DATE_VALUE_RE = re.compile(r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}')
+_VAT_VALUE_RE = re.compile(r'[A-Z]{2}\d{9}B\d{2}')
+
+# Date formats recognized by _analyze_value_characteristics
+_DATE_FORMATS = {
+    "dd-mm-yyyy": re.compile(r'\d{2}-\d{2}-\d{4}'),
+    "dd/mm/yyyy": re.compile(r'\d{2}/\d{2}/\d{4}'),
+    "d-m-yyyy": re.compile(r'\d{1,2}-\d{1,2}-\d{4}'),
+    "yyyy-mm-dd": re.compile(r'\d{4}-\d{2}-\d{2}')
+}
+
+@lru_cache(maxsize=1024)
+def _compile_pattern(pattern: str, flags: int) -> re.Pattern:
+    """Compile a template or suggested pattern once per pattern and flags."""
+    return re.compile(pattern, flags)
+
 @dataclass
 class PatternAnalysisResult:
     """Result of pattern analysis."""
@@ -23,7 +48,13 @@ class PatternAnalyzer:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
-        # Common pattern templates for different field types
+        # Common pattern templates for different field types. Templates that
+        # could start a match anywhere in a long run of digits, spaces or
+        # address characters would rescan the rest of the run from each
+        # position, taking quadratic time on such a run. The lookbehind right
+        # after their first character skips positions inside a run, where a
+        # match can only start if the previous match ended there. findall()
+        # returns the same values as for the plain pattern in the comment.
         self.pattern_templates = {
             "text": [
                 r'([A-Za-z0-9\s\-\.]+)',
@@ -33,7 +64,7 @@ class PatternAnalyzer:
             ],
             "number": [
                 r'(\d+)',
-                r'(\d+[.,]\d+)',
+                r'(\d(?<!\d\d)\d*[.,]\d+)',  # (\d+[.,]\d+)
                 r'(\d{1,3}(?:[.,]\d{3})*[.,]\d{2})'
             ],
             "date": [
@@ -43,8 +74,8 @@ class PatternAnalyzer:
                 r'(\d{4}-\d{2}-\d{2})'
             ],
             "amount": [
-                r'€?\s*(\d+[.,]\d{2})',
-                r'(\d+[.,]\d{2})\s*€?',
+                r'(?:€\s*|\s(?<!\s\s)\s*)?(\d(?:(?<!\d\d)|(?<=[.,]\d\d\d))\d*[.,]\d{2})',  # €?\s*(\d+[.,]\d{2})
+                r'(\d(?:(?<!\d\d)|(?<=[.,]\d\d\d))\d*[.,]\d{2})\s*€?',  # (\d+[.,]\d{2})\s*€?
                 r'€\s*(\d{1,3}(?:[.,]\d{3})*[.,]\d{2})',
                 r'(\d{1,3}(?:[.,]\d{3})*[.,]\d{2})\s*EUR?'
             ],
@@ -54,8 +85,10 @@ class PatternAnalyzer:
                 r'(NL\d{9}B\d{2})'
             ],
             "email": [
-                r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-                r'([^\s@]+@[^\s@]+\.[^\s@]+)'
+                # ([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})
+                r'([a-zA-Z0-9._%+-](?:(?<![a-zA-Z0-9._%+-][a-zA-Z0-9._%+-])|(?<=[.a-zA-Z][a-zA-Z]{2}[0-9._%+-]))'
+                r'[a-zA-Z0-9._%+-]*@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+                r'([^\s@](?<![^\s@][^\s@])[^\s@]*@[^\s@]+\.[^\s@]+)'  # ([^\s@]+@[^\s@]+\.[^\s@]+)
             ],
             "phone": [
                 r'(\+31\s*\d{1,3}\s*\d{3}\s*\d{4})',
@@ -126,23 +159,31 @@ class PatternAnalyzer:
         )
     
     def _extract_potential_values(self, text_samples: List[str], field_type: str) -> List[str]:
-        """Extract potential values for the given field type from text samples."""
+        """Extract potential values for the given field type from text samples.
+        
+        Returns the first distinct values that pass the quality filter, in
+        the order they are found; searching stops once there are enough.
+        """
         
-        potential_values = []
+        seen = set()
+        filtered_values = []
         
         # Get pattern templates for the field type
         templates = self.pattern_templates.get(field_type, self.pattern_templates["text"])
         
         for text in text_samples:
             for template in templates:
-                matches = re.findall(template, text, re.IGNORECASE | re.MULTILINE)
-                potential_values.extend(matches)
-        
-        # Remove duplicates and filter by quality
-        unique_values = list(set(potential_values))
-        filtered_values = self._filter_values_by_quality(unique_values, field_type)
+                matches = _compile_pattern(template, _SEARCH_FLAGS).findall(text)
+                
+                # Remove duplicates and filter by quality
+                new_values = [value for value in dict.fromkeys(matches) if value not in seen]
+                seen.update(new_values)
+                filtered_values.extend(self._filter_values_by_quality(new_values, field_type))
+                
+                if len(filtered_values) >= _MAX_POTENTIAL_VALUES:
+                    return filtered_values[:_MAX_POTENTIAL_VALUES]
         
-        return filtered_values[:20]  # Limit to top 20 values
+        return filtered_values
     
     def _filter_values_by_quality(self, values: List[str], field_type: str) -> List[str]:
         """Filter values based on quality criteria for the field type."""
@@ -158,17 +199,17 @@ class PatternAnalyzer:
             # Field-specific quality filters
             if field_type == "amount":
                 # Must contain digits and reasonable length
-                if re.search(r'\d', value) and len(value) <= 15:
+                if _DIGIT_RE.search(value) and len(value) <= 15:
                     filtered.append(value)
             
             elif field_type == "date":
                 # Must look like a date
-                if re.match(r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}', value):
+                if _DATE_VALUE_RE.match(value):
                     filtered.append(value)
             
             elif field_type == "vat_number":
                 # Must match VAT number format
-                if re.match(r'[A-Z]{2}\d{9}B\d{2}', value):
+                if _VAT_VALUE_RE.match(value):
                     filtered.append(value)
             
             elif field_type == "email":
@@ -178,7 +219,7 @@ class PatternAnalyzer:
             
             elif field_type == "phone":
                 # Must contain enough digits
-                digits = re.findall(r'\d', value)
+                digits = _DIGIT_RE.findall(value)
                 if len(digits) >= 8:
                     filtered.append(value)
             
@@ -224,43 +265,47 @@ class PatternAnalyzer:
     def _create_pattern_for_value(self, value: str, field_type: str, text_samples: List[str]) -> Optional[Dict[str, Any]]:
         """Create a regex pattern for a specific value."""
         
-        # Look for context around the value in samples
-        context_patterns = []
+        # Look for context around the value in samples, counting how often
+        # each keyword is found before or after it
+        context_counts = Counter()
+        escaped_value = re.escape(value)
+        value_re = _compile_pattern(escaped_value, re.IGNORECASE)
+        
+        # Keywords to look for in the context, lowercased once
+        keywords = [(keyword, keyword.lower()) for keyword in self.field_keywords.get(field_type, [])]
         
         for text in text_samples:
             # Find all occurrences of the value
-            escaped_value = re.escape(value)
-            matches = re.finditer(escaped_value, text, re.IGNORECASE)
+            matches = value_re.finditer(text)
             
             for match in matches:
                 start, end = match.span()
                 
                 # Get context before and after
-                before = text[max(0, start-50):start].strip()
-                after = text[end:end+50].strip()
+                before = text[max(0, start-50):start].strip().lower()
+                after = text[end:end+50].strip().lower()
                 
                 # Look for keywords in the context
-                keywords = self.field_keywords.get(field_type, [])
-                
-                for keyword in keywords:
-                    if keyword.lower() in before.lower():
-                        # Create pattern with keyword context
-                        keyword_pattern = rf'{re.escape(keyword)}[:\s]*({escaped_value})'
-                        context_patterns.append(keyword_pattern)
+                for keyword, keyword_lower in keywords:
+                    if keyword_lower in before:
+                        context_counts[keyword, True] += 1
                     
-                    elif keyword.lower() in after.lower():
-                        # Create pattern with value before keyword
-                        keyword_pattern = rf'({escaped_value})[:\s]*{re.escape(keyword)}'
-                        context_patterns.append(keyword_pattern)
+                    elif keyword_lower in after:
+                        context_counts[keyword, False] += 1
         
         # If no context found, create a simple pattern
-        if not context_patterns:
-            simple_pattern = f'({re.escape(value)})'
+        if not context_counts:
+            simple_pattern = f'({escaped_value})'
             confidence = 0.3  # Low confidence for patterns without context
         else:
-            # Use the most common context pattern
-            pattern_counts = Counter(context_patterns)
-            simple_pattern = pattern_counts.most_common(1)[0][0]
+            # Use the most common context, first found on a tie
+            (keyword, keyword_before), _ = context_counts.most_common(1)[0]
+            if keyword_before:
+                # Create pattern with keyword context
+                simple_pattern = rf'{re.escape(keyword)}[:\s]*({escaped_value})'
+            else:
+                # Create pattern with value before keyword
+                simple_pattern = rf'({escaped_value})[:\s]*{re.escape(keyword)}'
             confidence = 0.7  # Higher confidence for patterns with context
         
         # Test pattern against samples
@@ -357,15 +402,8 @@ class PatternAnalyzer:
         # Analyze date patterns
         elif field_type == "date":
             # Check for different date formats
-            formats = {
-                "dd-mm-yyyy": r'\d{2}-\d{2}-\d{4}',
-                "dd/mm/yyyy": r'\d{2}/\d{2}/\d{4}',
-                "d-m-yyyy": r'\d{1,2}-\d{1,2}-\d{4}',
-                "yyyy-mm-dd": r'\d{4}-\d{2}-\d{2}'
-            }
-            
-            for format_name, format_pattern in formats.items():
-                format_count = sum(1 for v in values if re.match(format_pattern, v))
+            for format_name, format_re in _DATE_FORMATS.items():
+                format_count = sum(1 for v in values if format_re.match(v))
                 if format_count >= len(values) * 0.3:
                     characteristics[format_name] = {
                         "count": format_count,
@@ -441,9 +479,10 @@ class PatternAnalyzer:
         try:
             matches = 0
             total_samples = len(text_samples)
+            compiled = _compile_pattern(pattern, _SEARCH_FLAGS)
             
             for text in text_samples:
-                if re.search(pattern, text, re.IGNORECASE | re.MULTILINE):
+                if compiled.search(text):
                     matches += 1
             
             return matches / total_samples if total_samples > 0 else 0.0
@@ -465,7 +504,7 @@ class PatternAnalyzer:
             for pattern_data in patterns:
                 pattern = pattern_data["pattern"]
                 try:
-                    if re.search(pattern, text, re.IGNORECASE | re.MULTILINE):
+                    if _compile_pattern(pattern, _SEARCH_FLAGS).search(text):
                         sample_covered = True
                         break
                 except re.error:
@@ -2,6 +2,7 @@
 
 import re
 import logging
+from functools import lru_cache
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from decimal import Decimal
@@ -14,6 +15,15 @@ from .template_models import Template, FieldPattern, ExtractionRule, ExtractionM
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1024)
+def _compile_field_pattern(pattern: str, whole_word: bool, flags: int) -> re.Pattern:
+    """Compile a template field regex once per supplier pattern."""
+    if whole_word:
+        # Add word boundaries
+        pattern = r'\b' + pattern + r'\b'
+    return re.compile(pattern, flags)
+
+
 class TemplateEngine:
     """Engine for applying templates to extract invoice data."""
     
@@ -168,13 +178,7 @@ class TemplateEngine:
             flags |= re.MULTILINE
         
         try:
-            if pattern.whole_word:
-                # Add word boundaries
-                regex_pattern = r'\b' + pattern.pattern + r'\b'
-            else:
-                regex_pattern = pattern.pattern
-            
-            match = re.search(regex_pattern, text, flags)
+            match = _compile_field_pattern(pattern.pattern, pattern.whole_word, flags).search(text)
             
             if match:
                 # Extract value (use first group if available, otherwise full match)
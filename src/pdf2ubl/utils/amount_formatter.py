@@ -1,6 +1,25 @@
-"""Amount formatting utilities for UBL XML."""
+"""Amount formatting utilities for UBL XML.
+
+The formatters are memoized: invoices repeat the same prices, VAT
+percentages and quantities on many lines, and Decimal quantize plus
+formatting dominates numeric serialisation cost. The caches are keyed on
+the text of the number rather than the number itself, since equal numbers
+can still format differently (0.0 and -0.0, Decimal('0') and Decimal('-0')).
+"""
 
 from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
+
+# Quantizer for the two decimal places used by every UBL amount
+_CENTS = Decimal('0.01')
+
+
+@lru_cache(maxsize=2048)
+def _format_decimal_text(text, decimal_places):
+    """Round the number written in text and format it with decimal_places."""
+    quantizer = _CENTS if decimal_places == 2 else Decimal('0.' + '0' * decimal_places)
+    rounded = Decimal(text).quantize(quantizer, rounding=ROUND_HALF_UP)
+    return f"{rounded:.{decimal_places}f}"
 
 
 def format_amount_for_xml(amount, decimal_places=2):
@@ -16,18 +35,13 @@ def format_amount_for_xml(amount, decimal_places=2):
     if amount is None:
         return "0.00"
     
-    # Convert to Decimal for precise calculation
+    # Convert to Decimal text for precise calculation
     if isinstance(amount, str):
-        decimal_amount = Decimal(amount.replace(',', '.'))
+        text = amount.replace(',', '.')
     else:
-        decimal_amount = Decimal(str(amount))
+        text = str(amount)
     
-    # Round to specified decimal places
-    quantizer = Decimal('0.' + '0' * decimal_places)
-    rounded_amount = decimal_amount.quantize(quantizer, rounding=ROUND_HALF_UP)
-    
-    # Format with exact decimal places
-    return f"{rounded_amount:.{decimal_places}f}"
+    return _format_decimal_text(text, decimal_places)
 
 
 def format_percentage_for_xml(percentage):
@@ -42,10 +56,7 @@ def format_percentage_for_xml(percentage):
     if percentage is None:
         return "0.00"
     
-    decimal_percentage = Decimal(str(percentage))
-    rounded_percentage = decimal_percentage.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-    
-    return f"{rounded_percentage:.2f}"
+    return _format_decimal_text(str(percentage), 2)
 
 
 def format_quantity_for_xml(quantity):
@@ -60,7 +71,4 @@ def format_quantity_for_xml(quantity):
     if quantity is None:
         return "1.00"
     
-    decimal_quantity = Decimal(str(quantity))
-    rounded_quantity = decimal_quantity.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-    
-    return f"{rounded_quantity:.2f}"
\ No newline at end of file
+    return _format_decimal_text(str(quantity), 2)
\ No newline at end of file
@@ -25,6 +25,17 @@ def test_pdf_extraction_functionality():
         extractor.extract_text("/nonexistent/file.pdf")
 
 
+def test_basic_info_keyword_prefilter_case_folding():
+    """Test the keyword prefilter keeps fields re.IGNORECASE would match."""
+    from src.pdf2ubl.extractors.pdf_extractor import PDFExtractor, ExtractedInvoiceData
+
+    extractor = PDFExtractor()
+    for text in ("İnvoice 123", "ınvoice 123", "Invoice 123"):
+        data = ExtractedInvoiceData()
+        extractor._extract_basic_info(text, data)
+        assert data.invoice_number == "123", text
+
+
 def test_template_detection():
     """Test template detection logic."""
     from src.pdf2ubl.templates.template_manager import TemplateManager
@@ -168,6 +179,43 @@ def test_date_parsing():
         pytest.skip("date_parser module not available")
 
 
+def test_amount_formatting_signed_zero():
+    """Test cached amount formatting does not depend on call order."""
+    from src.pdf2ubl.utils.amount_formatter import format_amount_for_xml, format_quantity_for_xml
+
+    assert format_amount_for_xml(0.0) == "0.00"
+    assert format_amount_for_xml(-0.0) == "-0.00"
+    assert format_amount_for_xml(Decimal('0')) == "0.00"
+    assert format_amount_for_xml(Decimal('-0')) == "-0.00"
+    assert format_quantity_for_xml(-0.0) == "-0.00"
+    assert format_quantity_for_xml(0.0) == "0.00"
+
+
+def test_ubl_exporter_date_parsing():
+    """Test date strings handed to the UBL exporter are parsed."""
+    from datetime import datetime
+    from src.pdf2ubl.exporters.ubl_exporter import _parse_date, _coerce_date
+
+    test_cases = [
+        ("2024-01-31", datetime(2024, 1, 31)),
+        ("31-01-2024", datetime(2024, 1, 31)),
+        ("31.01.2024", datetime(2024, 1, 31)),
+        ("31/01/2024", datetime(2024, 1, 31)),
+        ("1-1-2024", datetime(2024, 1, 1)),
+        ("15 december 2023", datetime(2023, 12, 15)),
+        ("31-02-2024", None),
+        ("not a date", None),
+    ]
+
+    for input_str, expected in test_cases:
+        result = _parse_date(input_str)
+        assert result == expected, f"Failed for {input_str}: got {result}, expected {expected}"
+
+    existing = datetime(2024, 5, 1)
+    assert _coerce_date(existing) is existing
+    assert _coerce_date(None) is None
+
+
 def test_api_endpoints():
     """Test API endpoint imports and basic functionality."""
     try:
@@ -347,4 +395,131 @@ def test_template_confidence_scoring():
             assert 0 <= low_score <= 1
             
     except (ImportError, AttributeError):
-        pytest.skip("Template confidence scoring not available")
\ No newline at end of file
+        pytest.skip("Template confidence scoring not available")
+
+def test_xml_generator_streaming_matches_tree(tmp_path):
+    """Test streamed UBL XML matches the in-memory generator output."""
+    from lxml import etree
+    from src.pdf2ubl.exporters.ubl_exporter import UBLExporter
+
+    exporter = UBLExporter()
+    invoice = exporter.create_test_invoice()
+    generator = exporter.xml_generator
+
+    output_path = tmp_path / "invoice.xml"
+    generator.generate_xml_to_file(invoice, output_path)
+
+    parser = etree.XMLParser(remove_blank_text=True)
+    streamed = etree.parse(str(output_path), parser).getroot()
+    in_memory = etree.fromstring(generator.generate_xml(invoice).encode('utf-8'), parser)
+
+    assert etree.tostring(streamed) == etree.tostring(in_memory)
+
+
+def test_xml_generator_iso_date_uses_calendar_date():
+    """Test equal aware datetimes are formatted by their own calendar date."""
+    from datetime import datetime, timedelta, timezone
+    from src.pdf2ubl.exporters.xml_generator import _iso_date
+
+    utc = datetime(2024, 1, 1, 23, 30, tzinfo=timezone.utc)
+    cet = datetime(2024, 1, 2, 0, 30, tzinfo=timezone(timedelta(hours=1)))
+    assert utc == cet
+    assert _iso_date(utc) == "2024-01-01"
+    assert _iso_date(cet) == "2024-01-02"
+
+
+def test_xml_generator_required_codes_default():
+    """Test empty required codes fall back to the model defaults."""
+    from lxml import etree
+    from src.pdf2ubl.exporters.ubl_exporter import UBLExporter
+
+    exporter = UBLExporter()
+    invoice = exporter.create_test_invoice()
+    invoice.invoice_type_code = ""
+    for payment_means in invoice.payment_means:
+        payment_means.payment_means_code = ""
+
+    root = etree.fromstring(exporter.xml_generator.generate_xml(invoice).encode("utf-8"))
+    cbc = exporter.xml_generator.namespaces["cbc"]
+    assert root.findtext("{%s}InvoiceTypeCode" % cbc) == "380"
+    assert root.findtext(".//{%s}PaymentMeansCode" % cbc) == "31"
+
+
+def test_xml_generator_line_text_round_trip(tmp_path):
+    """Test invoice line text is written as lxml writes element text."""
+    from lxml import etree
+    from src.pdf2ubl.exporters.ubl_exporter import UBLExporter
+
+    exporter = UBLExporter()
+    invoice = exporter.create_test_invoice()
+    generator = exporter.xml_generator
+    description = "Regel 1\r\nRegel 2 & ]]> <b>"
+    line = invoice.invoice_lines[0]
+    line.item_description = description
+    line.item_name = "Naam\rtwee"
+
+    xml = generator.generate_xml(invoice)
+    output_path = tmp_path / "invoice.xml"
+    generator.generate_xml_to_file(invoice, output_path)
+
+    cbc = generator.namespaces["cbc"]
+    expected = etree.Element("{%s}Description" % cbc, nsmap={"cbc": cbc})
+    expected.text = description
+    expected_xml = etree.tostring(expected).decode().split(">", 1)[1]
+    assert ("<cbc:Description>" + expected_xml) in xml
+
+    for root in (etree.fromstring(xml.encode("utf-8")), etree.parse(str(output_path)).getroot()):
+        assert root.findtext(".//{%s}Description" % cbc) == description
+        assert root.find(".//{%s}Item/{%s}Name" % (generator.namespaces["cac"], cbc)).text == "Naam\rtwee"
+
+
+def test_text_extractor_batch_matches_single():
+    """Test batch extraction returns the per-document results in order."""
+    from src.pdf2ubl.extractors.text_extractor import TextExtractor
+
+    extractor = TextExtractor()
+    texts = [
+        "Factuur nr: F-2024-001\nDatum: 15 januari 2024\nTotaal: 1.234,56 €",
+        "",
+        "Invoice number: INV123\nVAT: NL123456789B01\nKerkstraat 12\n1234 AB Amsterdam",
+    ]
+
+    assert extractor.extract_all_batch(texts, workers=2) == [extractor.extract_all(text) for text in texts]
+    assert extractor.extract_all_batch([]) == []
+
+
+def test_confidence_prediction():
+    """Test confidence prediction for invoice and non-invoice text."""
+    from src.pdf2ubl.ml.confidence_predictor import ConfidencePredictor
+    from src.pdf2ubl.templates.template_manager import TemplateManager
+
+    template = TemplateManager().get_template('generic_nl')
+    if not template:
+        pytest.skip("generic_nl template not available")
+
+    predictor = ConfidencePredictor()
+    invoice_text = "Factuur nr: F-2024-001\nDatum: 15-01-2024\nTotaal: € 121,00"
+    other_text = "Some random text"
+    invoice = predictor.predict_confidence(template, invoice_text)
+    other = predictor.predict_confidence(template, other_text)
+
+    assert 0 <= invoice.overall_confidence <= 1
+    assert 0 <= invoice.quality_score <= 1
+    assert invoice.quality_score > other.quality_score
+    assert "Document doesn't appear to be an invoice. Verify document type." in other.recommendations
+    assert "Document doesn't appear to be an invoice. Verify document type." not in invoice.recommendations
+
+    batch = predictor.predict_confidence_batch(template, [invoice_text, other_text])
+    assert batch == [invoice, other]
+
+
+def test_confidence_pattern_with_unmatched_first_group():
+    """Test a match whose first group did not take part is scored on the whole match."""
+    from src.pdf2ubl.ml.confidence_predictor import ConfidencePredictor
+    from src.pdf2ubl.templates.template_models import FieldPattern, FieldType, ExtractionMethod
+
+    pattern = FieldPattern(pattern=r'(\d+)?(EUR)', method=ExtractionMethod.REGEX, field_type=FieldType.AMOUNT)
+    confidence = ConfidencePredictor()._test_pattern(pattern, "Total EUR")
+
+    assert confidence is not None
+    assert 0 <= confidence <= 1